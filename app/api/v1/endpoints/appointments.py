@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
@@ -8,15 +8,18 @@ from app.schemas.appointment import (
     AppointmentCreate, 
     AppointmentUpdate,
     AppointmentStatusUpdate,
-    AppointmentSlot
+    AppointmentSlot,
+    AppointmentBulkResult
 )
 from app.services.appointment import AppointmentService
 from app.services.auth import (
     get_current_active_user,
     get_current_active_patient,
-    get_current_active_doctor
+    get_current_active_doctor,
+    get_current_active_admin
 )
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.utils.pagination import set_next_cursor
 from app.models.user import User
 
 router = APIRouter()
@@ -27,27 +30,39 @@ async def create_appointment(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_patient)
 ):
-    return await AppointmentService.create_appointment(db, appointment_in, current_user.id)
+    return await AppointmentService.create_appointment(db, appointment_in)
+
+@router.post("/bulk", response_model=List[AppointmentBulkResult])
+async def create_appointments_bulk(
+    appointments_in: List[AppointmentCreate],
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin)
+):
+    return await AppointmentService.create_appointments_bulk(db, appointments_in)
 
 @router.get("/", response_model=List[Appointment])
 async def read_appointments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,  # from the X-Next-Cursor header of the previous page
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    return await AppointmentService.get_appointments(db, skip=skip, limit=limit)
+    appointments = await AppointmentService.get_appointments(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, appointments, limit, key=lambda item: [item.scheduled_time, item.id])
+    return appointments
 
 @router.get("/my-appointments", response_model=List[Appointment])
 async def read_my_appointments(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_patient)
 ):
     return await AppointmentService.get_patient_appointments(db, current_user.id)
 
 @router.get("/doctor-appointments", response_model=List[Appointment])
 async def read_doctor_appointments(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_doctor)
 ):
     return await AppointmentService.get_doctor_appointments(db, current_user.id)
@@ -56,10 +71,27 @@ async def read_doctor_appointments(
 async def get_available_slots(
     doctor_id: int,
     date: str,  # YYYY-MM-DD format
+    end_date: Optional[str] = None,  # inclusive, defaults to `date`
+    slot_minutes: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    return await AppointmentService.get_available_slots(db, doctor_id, date)
+    return await AppointmentService.get_available_slots(
+        db, doctor_id, date, end_date=end_date, slot_minutes=slot_minutes
+    )
+
+@router.get("/earliest-slots", response_model=List[AppointmentSlot])
+async def get_earliest_slots(
+    specialization: str,
+    limit: int = 5,
+    days: Optional[int] = None,  # search horizon, defaults to EARLIEST_SLOTS_DEFAULT_DAYS
+    slot_minutes: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return await AppointmentService.find_earliest_slots(
+        db, specialization, limit=limit, days=days, slot_minutes=slot_minutes
+    )
 
 @router.put("/{appointment_id}/status", response_model=Appointment)
 async def update_appointment_status(
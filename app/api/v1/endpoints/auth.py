@@ -4,14 +4,20 @@ from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from app.schemas.user import Token, UserCreate, UserInDB, UserUpdate, PasswordResetRequest, PasswordReset
+from app.schemas.user import (
+    Token, UserCreate, UserInDB, UserUpdate, PasswordResetRequest, PasswordReset, RefreshTokenRequest
+)
 from app.services.auth import (
     authenticate_user,
-    create_access_token,
+    create_user_access_token,
+    create_refresh_token,
+    rotate_refresh_token,
     get_current_active_user,
-    get_password_hash,
+    aget_password_hash,
     send_password_reset_email,
-    reset_password
+    reset_password,
+    invalidate_user_cache,
+    revoke_user_tokens
 )
 from app.database import get_db
 from app.models.user import User
@@ -33,10 +39,20 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    access_token = await create_user_access_token(user, expires_delta=access_token_expires)
+    refresh_token = await create_refresh_token(user)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    refresh_in: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Renew a session without re-sending credentials; the refresh token is single use"""
+    user, refresh_token = await rotate_refresh_token(db, refresh_in.refresh_token)
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = await create_user_access_token(user, expires_delta=access_token_expires)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
 @router.post("/register", response_model=UserInDB)
 async def register_user(
@@ -50,7 +66,7 @@ async def register_user(
             detail="Email already registered"
         )
     
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await aget_password_hash(user_in.password)
     db_user = User(
         email=user_in.email,
         hashed_password=hashed_password,
@@ -59,7 +75,6 @@ async def register_user(
     )
     db.add(db_user)
     await db.commit()
-    await db.refresh(db_user)
     return db_user
 
 @router.get("/me", response_model=UserInDB)
@@ -72,12 +87,20 @@ async def update_user_profile(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
+    # current_user comes from the auth cache and is detached, so update the row itself
+    user = await db.get(User, current_user.id)
     update_data = user_in.dict(exclude_unset=True)
+    password = update_data.pop("password", None)
+    if password:
+        user.hashed_password = await aget_password_hash(password)
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(user, field, value)
     await db.commit()
-    await db.refresh(current_user)
-    return current_user
+    await invalidate_user_cache(current_user.email, user.email)
+    # Tokens embed email, role and status; a password change also ends other sessions
+    if password or update_data.keys() & {"email", "role", "is_active"}:
+        await revoke_user_tokens(user.id)
+    return user
 
 @router.post("/password-reset-request")
 async def request_password_reset(
@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from app.schemas.patient import Patient 
@@ -15,7 +15,8 @@ from app.schemas.doctor import (
 )
 from app.services.doctor import DoctorService
 from app.services.auth import get_current_active_user, get_current_active_doctor
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.utils.pagination import set_next_cursor
 from app.models.user import User
 
 router = APIRouter()
@@ -30,16 +31,20 @@ async def create_doctor(
 
 @router.get("/", response_model=List[Doctor])
 async def read_doctors(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,  # from the X-Next-Cursor header of the previous page
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    return await DoctorService.get_doctors(db, skip=skip, limit=limit)
+    doctors = await DoctorService.get_doctors(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, doctors, limit, key=lambda item: [item.id])
+    return doctors
 
 @router.get("/me", response_model=Doctor)
 async def read_doctor_profile(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_doctor)
 ):
     return await DoctorService.get_doctor_by_user_id(db, current_user.id)
@@ -55,7 +60,7 @@ async def update_doctor_profile(
 @router.get("/{doctor_id}", response_model=Doctor)
 async def read_doctor(
     doctor_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db),  # a miss fills the shared cache, so never load it from a lagging replica
     current_user: User = Depends(get_current_active_user)
 ):
     return await DoctorService.get_doctor(db, doctor_id)
@@ -88,7 +93,7 @@ async def add_doctor_availability(
 
 @router.get("/availability", response_model=List[DoctorAvailability])
 async def get_doctor_availability(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_doctor)
 ):
     return await DoctorService.get_doctor_availability(db, current_user.id)
@@ -113,7 +118,7 @@ async def delete_doctor_availability(
 
 @router.get("/my-patients", response_model=List[Patient])
 async def get_my_patients(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_doctor)
 ):
     return await DoctorService.get_my_patients(db, current_user.id)
\ No newline at end of file
@@ -14,7 +14,7 @@ from app.services.auth import (
     get_current_active_patient,
     get_current_active_doctor
 )
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
 
 router = APIRouter()
@@ -29,7 +29,7 @@ async def create_medical_record(
 
 @router.get("/my-records", response_model=List[MedicalRecord])
 async def read_my_medical_records(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_patient)
 ):
     return await MedicalRecordService.get_patient_records(db, current_user.id)
@@ -37,7 +37,7 @@ async def read_my_medical_records(
 @router.get("/patient/{patient_id}", response_model=List[MedicalRecord])
 async def read_patient_records(
     patient_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_doctor)
 ):
     return await MedicalRecordService.get_patient_records(db, patient_id)
@@ -45,7 +45,7 @@ async def read_patient_records(
 @router.get("/{record_id}", response_model=MedicalRecord)
 async def read_medical_record(
     record_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     return await MedicalRecordService.get_medical_record(db, record_id)
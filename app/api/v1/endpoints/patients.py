@@ -1,12 +1,13 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from app.schemas.patient import Patient, PatientCreate, PatientUpdate, PatientProfileUpdate
 from app.services.patient import PatientService
 from app.services.auth import get_current_active_user, get_current_active_patient
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.utils.pagination import set_next_cursor
 from app.models.user import User
 
 router = APIRouter()
@@ -21,16 +22,20 @@ async def create_patient(
 
 @router.get("/", response_model=List[Patient])
 async def read_patients(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,  # from the X-Next-Cursor header of the previous page
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    return await PatientService.get_patients(db, skip=skip, limit=limit)
+    patients = await PatientService.get_patients(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, patients, limit, key=lambda item: [item.id])
+    return patients
 
 @router.get("/me", response_model=Patient)
 async def read_patient_profile(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_patient)
 ):
     return await PatientService.get_patient_by_user_id(db, current_user.id)
@@ -46,7 +51,7 @@ async def update_patient_profile(
 @router.get("/{patient_id}", response_model=Patient)
 async def read_patient(
     patient_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db),  # a miss fills the shared cache, so never load it from a lagging replica
     current_user: User = Depends(get_current_active_user)
 ):
     return await PatientService.get_patient(db, patient_id)
@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select, delete, insert, and_
+
+from app.database import init_db_engine, get_engine, get_async_session_maker
+from app.models.appointment import Appointment, AppointmentStatus, SlotLedgerEntry
+from app.services.slot_ledger import ledger_slots
+
+logger = logging.getLogger(__name__)
+
+async def backfill_slot_ledger(batch_size: int = 1000, rebuild: bool = False) -> None:
+    """Populate appointment_slot_ledger from the non-cancelled rows of appointments"""
+    # Databases initialised before ledger mode existed don't have the table yet
+    async with get_engine().begin() as conn:
+        await conn.run_sync(SlotLedgerEntry.__table__.create, checkfirst=True)
+
+    async_session = get_async_session_maker()
+    async with async_session() as db:
+        if rebuild:
+            await db.execute(delete(SlotLedgerEntry))
+            await db.commit()
+            logger.info("Cleared existing slot ledger")
+
+        last_id = 0
+        claimed = duplicates = 0
+        while True:
+            result = await db.execute(
+                select(Appointment.id, Appointment.doctor_id, Appointment.scheduled_time, Appointment.end_time)
+                .where(
+                    and_(
+                        Appointment.id > last_id,
+                        Appointment.status != AppointmentStatus.CANCELLED
+                    )
+                )
+                .order_by(Appointment.id)
+                .limit(batch_size)
+            )
+            batch = result.all()
+            if not batch:
+                break
+
+            rows = [
+                {"doctor_id": doctor_id, "slot_start": slot, "appointment_id": appointment_id}
+                for appointment_id, doctor_id, start, end in batch
+                for slot in ledger_slots(start, end)
+            ]
+            if rows:
+                # Existing double bookings can't both hold a slot; keep the first and report the rest
+                inserted = await db.execute(insert(SlotLedgerEntry).prefix_with("IGNORE"), rows)
+                affected = inserted.rowcount if inserted.rowcount >= 0 else len(rows)
+                claimed += affected
+                duplicates += len(rows) - affected
+            await db.commit()
+            last_id = batch[-1][0]
+            logger.info(f"Backfilled slot ledger up to appointment {last_id}")
+
+        logger.info(f"✅ Slot ledger backfill finished: {claimed} slots claimed, {duplicates} already taken")
+        if duplicates:
+            logger.warning("Some appointments overlap existing claims; review them before enabling ledger mode")
+
+async def main(batch_size: int, rebuild: bool) -> None:
+    await init_db_engine()
+    try:
+        await backfill_slot_ledger(batch_size=batch_size, rebuild=rebuild)
+    finally:
+        await get_engine().dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Populate the appointment slot ledger")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--rebuild", action="store_true", help="delete existing claims first")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.batch_size, args.rebuild))
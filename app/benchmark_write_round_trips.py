@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import init_db_engine, get_engine
+from app.models.user import User
+from app.schemas.appointment import AppointmentCreate, AppointmentUpdate
+from app.schemas.doctor import DoctorCreate, DoctorUpdate, DoctorAvailabilityCreate, DoctorAvailabilityUpdate
+from app.schemas.medical_record import MedicalRecordCreate, MedicalRecordUpdate
+from app.schemas.patient import PatientCreate, PatientUpdate
+from app.services.appointment import AppointmentService
+from app.services.doctor import DoctorService
+from app.services.medical_record import MedicalRecordService
+from app.services.patient import PatientService
+
+logger = logging.getLogger(__name__)
+
+class StatementCounter:
+    """Counts statements sent to MySQL while active"""
+
+    def __init__(self):
+        self.active = False
+        self.statements = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.statements += 1
+
+async def _measure(
+    db: AsyncSession,
+    counter: StatementCounter,
+    results: Dict[str, Dict[str, List[float]]],
+    name: str,
+    write: Callable[[], Awaitable],
+    refresh_after: bool
+):
+    counter.statements = 0
+    counter.active = True
+    started = time.perf_counter()
+    obj = await write()
+    if refresh_after:
+        # What every write path did before: reload the row it just wrote. Some paths now
+        # return a transient object built from known values, which refresh() rejects, so
+        # issue the same SELECT by primary key instead
+        await db.get(type(obj), obj.id, populate_existing=True)
+    elapsed = time.perf_counter() - started
+    counter.active = False
+    results[name]["statements"].append(counter.statements)
+    results[name]["seconds"].append(elapsed)
+    return obj
+
+async def _run_once(db: AsyncSession, counter: StatementCounter, results, refresh_after: bool, run: int) -> None:
+    measure = lambda name, write: _measure(db, counter, results, name, write, refresh_after)
+
+    patient_user = User(email=f"bench-patient-{run}-{time.time_ns()}@example.com", hashed_password="x", role="patient")
+    doctor_user = User(email=f"bench-doctor-{run}-{time.time_ns()}@example.com", hashed_password="x", role="doctor")
+    db.add_all([patient_user, doctor_user])
+    await db.flush()
+
+    patient = await measure("create_patient", lambda: PatientService.create_patient(db, PatientCreate(
+        user_id=patient_user.id, first_name="Bench", last_name="Patient",
+        date_of_birth=date(1990, 1, 1), gender="other", phone_number="0700000000"
+    )))
+    await measure("update_patient", lambda: PatientService.update_patient(
+        db, patient.id, PatientUpdate(phone_number="0711111111")
+    ))
+
+    doctor = await measure("create_doctor", lambda: DoctorService.create_doctor(db, DoctorCreate(
+        user_id=doctor_user.id, first_name="Bench", last_name="Doctor",
+        specialization="benchmark", phone_number="0722222222"
+    )))
+    await measure("update_doctor", lambda: DoctorService.update_doctor(db, doctor.id, DoctorUpdate(bio="benchmark")))
+
+    start = datetime.combine(date.today() + timedelta(days=7), datetime.min.time()).replace(hour=9)
+    availability = await measure("add_availability", lambda: DoctorService.add_availability(db, DoctorAvailabilityCreate(
+        doctor_id=doctor.id, day_of_week=start.weekday(), start_time="08:00", end_time="17:00"
+    )))
+    await measure("update_availability", lambda: DoctorService.update_availability(
+        db, availability.id, DoctorAvailabilityUpdate(start_time="07:30")
+    ))
+
+    appointment = await measure("create_appointment", lambda: AppointmentService.create_appointment(db, AppointmentCreate(
+        patient_id=patient.id, doctor_id=doctor.id,
+        scheduled_time=start, end_time=start + timedelta(minutes=30)
+    )))
+    await measure("update_appointment", lambda: AppointmentService.update_appointment(
+        db, appointment.id, AppointmentUpdate(notes="benchmark")
+    ))
+
+    record = await measure("create_medical_record", lambda: MedicalRecordService.create_medical_record(
+        db, MedicalRecordCreate(patient_id=patient.id, appointment_id=appointment.id, diagnosis="benchmark")
+    ))
+    await measure("update_medical_record", lambda: MedicalRecordService.update_medical_record(
+        db, record.id, MedicalRecordUpdate(notes="benchmark")
+    ))
+
+    await measure("cancel_appointment", lambda: AppointmentService.cancel_appointment(db, appointment.id))
+
+async def benchmark(iterations: int) -> None:
+    """Run every write path with and without a trailing refresh and report statements and latency.
+
+    Everything runs inside one outer transaction that is rolled back at the end; the
+    services' own commits only release savepoints, so the database is left untouched.
+    """
+    engine = get_engine()
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    report = {}
+    try:
+        for refresh_after in (True, False):
+            results = defaultdict(lambda: defaultdict(list))
+            async with engine.connect() as conn:
+                transaction = await conn.begin()
+                db = AsyncSession(bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint")
+                try:
+                    for run in range(iterations):
+                        await _run_once(db, counter, results, refresh_after, run)
+                finally:
+                    await db.close()
+                    await transaction.rollback()
+            report[refresh_after] = results
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+
+    logger.info(f"{'operation':<24}{'stmts before':>14}{'stmts now':>11}{'saved':>7}{'ms before':>11}{'ms now':>9}")
+    for name in report[False]:
+        before, now = report[True][name], report[False][name]
+        statements_before = sum(before["statements"]) / len(before["statements"])
+        statements_now = sum(now["statements"]) / len(now["statements"])
+        ms_before = 1000 * sum(before["seconds"]) / len(before["seconds"])
+        ms_now = 1000 * sum(now["seconds"]) / len(now["seconds"])
+        logger.info(
+            f"{name:<24}{statements_before:>14.1f}{statements_now:>11.1f}"
+            f"{statements_before - statements_now:>7.1f}{ms_before:>11.2f}{ms_now:>9.2f}"
+        )
+
+async def main(iterations: int) -> None:
+    await init_db_engine()
+    try:
+        await benchmark(iterations)
+    finally:
+        await get_engine().dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count round trips per write path, with and without refresh")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main(args.iterations))
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, computed_field
-from typing import Optional
+from typing import Dict, List, Optional
 import logging
 from pathlib import Path
 
@@ -14,19 +14,78 @@ class Settings(BaseSettings):
     MYSQL_PORT: str = "3306"
     MYSQL_DATABASE: str
     
+    DB_POOL_SIZE: int = 10  # per worker process
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = 1800  # stay below MySQL's wait_timeout
+    DB_POOL_PREWARM: int = 0  # connections opened at startup, capped at DB_POOL_SIZE
+    DB_POOL_PRE_PING: bool = True  # extra round trip per checkout; pool_recycle alone may suffice
+    REPLICA_DATABASE_URL: Optional[str] = None  # read-only endpoints use it when set
+    READ_YOUR_WRITES_SECONDS: int = 5  # keep a client on the primary this long after it writes
+    
     # Redis settings
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_CACHE_EXPIRE: int = 3600
+    REDIS_MAX_CONNECTIONS: int = 50  # per worker process
+    REDIS_POOL_TIMEOUT: float = 1.0  # seconds to wait for a free pooled connection
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+    REDIS_COMMAND_TIMEOUT: float = 1.0  # upper bound per command or pipeline, including pool wait
+    REDIS_BREAKER_FAILURES: int = 5  # consecutive failures before calls fail fast
+    REDIS_BREAKER_RESET_SECONDS: float = 5.0  # how long calls fail fast before Redis is probed again
+    REDIS_MEMORY_FALLBACK: bool = False  # keep get/setex/delete working in-process while Redis is down
+    REDIS_MEMORY_FALLBACK_MAXSIZE: int = 10000
+    REDIS_MEMORY_FALLBACK_MAX_TTL: int = 300  # fallback entries are per worker, so keep them short-lived
+    CACHE_LEASE_MS: int = 3000  # cross-worker lease while one worker loads a missing key
+    CACHE_LEASE_WAIT_MS: int = 1000  # how long other workers wait for it before loading themselves
+    CACHE_EARLY_REFRESH_BETA: float = 1.0  # XFetch eagerness; 0 disables early refresh
+    ENTITY_CACHE_DISABLED: List[str] = []  # opt entities out of the read-through cache, e.g. ["appointment"]
+    ENTITY_CACHE_LOCAL_TTL: int = 30  # in-process tier, bounds staleness if an invalidation is missed
+    ENTITY_CACHE_LOCAL_MAXSIZE: int = 10000  # per entity
+    OPERATION_LOG_STREAM: str = "operation_log"
+    OPERATION_LOG_BUFFER_SIZE: int = 10000  # oldest entries are dropped beyond this
+    OPERATION_LOG_BATCH_SIZE: int = 200
+    OPERATION_LOG_FLUSH_INTERVAL: float = 1.0  # seconds between background flushes
+    OPERATION_LOG_STREAM_MAXLEN: int = 1_000_000  # approximate trim length of the stream
     
     # Auth settings
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    JWT_CACHE_MAXSIZE: int = 10000  # verified access tokens kept decoded, 0 disables
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14  # sliding; each rotation restarts the family's expiry
+    USER_CACHE_EXPIRE: int = 300  # Redis tier of the authenticated-user cache
+    USER_CACHE_LOCAL_TTL: int = 30  # in-process tier, bounds staleness if an invalidation is missed
+    USER_CACHE_LOCAL_MAXSIZE: int = 10000
+    JWT_CLAIMS_AUTH: bool = False  # authorize from token claims plus a Redis token-version check
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # bcrypt threads, defaults to the CPU count
+    PASSWORD_HASH_MAX_PENDING: int = 256  # queued hash/verify jobs beyond the workers before 503s
     
     # First superuser
     FIRST_SUPERUSER: str
     FIRST_SUPERUSER_PASSWORD: str
     
+    # Rate limits, written "limit/seconds" or "limit/seconds/scope" with scope user | ip
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT: str = "300/60"
+    RATE_LIMIT_AUTH: str = "10/60/ip"  # preset for /auth/token, /auth/register and password reset
+    RATE_LIMIT_ROUTES: Dict[str, str] = {}  # path prefix -> policy, e.g. {"/api/v1/patients": "60/60"}
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # key by X-Forwarded-For when behind a trusted proxy
+    
+    # Appointment settings
+    APPOINTMENT_CONFLICT_MODE: str = "index"  # index | sql | verify (index checked against SQL)
+    APPOINTMENT_INDEX_TTL: int = 60  # seconds before a doctor's conflict index is reloaded
+    APPOINTMENT_SLOT_MINUTES: int = 30
+    SCHEDULE_CACHE_TTL: int = 300  # seconds before a doctor's compiled availability is recompiled
+    AVAILABLE_SLOTS_MAX_DAYS: int = 31
+    EARLIEST_SLOTS_DEFAULT_DAYS: int = 14
+    APPOINTMENT_BULK_MAX_ITEMS: int = 500
+    BOOKING_LOCK_TTL_MS: int = 5000  # lease expiry if a worker dies inside the critical section
+    BOOKING_LOCK_WAIT_MS: int = 2000  # bounded wait before a booking fails with 503
+    APPOINTMENT_BOOKING_MODE: str = "lock"  # lock | ledger (unique (doctor_id, slot_start) claims)
+    # Ledger mode treats bookings as whole buckets, so times should fall on these boundaries;
+    # changing it requires re-running app.backfill_slot_ledger --rebuild
+    SLOT_LEDGER_MINUTES: int = 15
+    
     # Debug mode
     DEBUG: bool = False
     
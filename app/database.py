@@ -1,10 +1,19 @@
 # database.py
 import asyncio
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from sqlalchemy import text
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Optional, Type
+from fastapi import Request
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine, async_sessionmaker
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import event, text
+from starlette.datastructures import MutableHeaders
 from app.config import settings
+from app.models.base import Base
+from app.utils.metrics import metrics
 import logging
 
 __all__ = [
@@ -13,27 +22,88 @@ __all__ = [
     'get_engine',
     'get_async_session_maker',
     'get_db',
+    'get_read_db',
+    'get_replica_engine',
     'check_db_connection',
-    'create_database'
+    'create_database',
+    'create_engine'
 ]
 
 logger = logging.getLogger(__name__)
 
-Base = declarative_base()
-
 # Initialize these as None at module level
 _engine = None
 _async_session_maker = None
+_replica_engine = None
+_replica_session_maker = None
+
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"  # for clients that don't keep cookies
+# Set per request by ReadYourWritesMiddleware; commits that wrote record their time in it
+_request_writes: ContextVar[Optional[dict]] = ContextVar("request_writes", default=None)
+# Set per request by SessionMetricsMiddleware; sessions note whether they used a connection
+_request_sessions: ContextVar[Optional[dict]] = ContextVar("request_sessions", default=None)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports checkout wait time, overflow connections and timeouts"""
+
+    metrics_prefix = "db_pool"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow = self._overflow
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            metrics.incr(f"{self.metrics_prefix}.timeouts")
+            raise
+        finally:
+            metrics.observe(f"{self.metrics_prefix}.checkout_seconds", time.perf_counter() - started)
+        if self._overflow > overflow and self._overflow > 0:
+            metrics.incr(f"{self.metrics_prefix}.overflow_connections")
+        return connection
+
+class ReplicaQueuePool(InstrumentedQueuePool):
+    metrics_prefix = "db_replica_pool"
+
+def create_engine(url: str, poolclass: Type[InstrumentedQueuePool] = InstrumentedQueuePool) -> AsyncEngine:
+    """Build an engine with the DB_POOL_* settings; the only place engines are configured"""
+    engine = create_async_engine(
+        url,
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        echo=settings.DEBUG
+    )
+    # engine.pool is looked up on each read because dispose() swaps in a fresh pool
+    prefix = poolclass.metrics_prefix
+    metrics.gauge(f"{prefix}.size", lambda: engine.pool.size())
+    metrics.gauge(f"{prefix}.checked_out", lambda: engine.pool.checkedout())
+    metrics.gauge(f"{prefix}.checked_in", lambda: engine.pool.checkedin())
+    metrics.gauge(f"{prefix}.overflow", lambda: max(engine.pool.overflow(), 0))
+    return engine
+
+async def prewarm_pool(engine: AsyncEngine, connections: int) -> None:
+    """Open connections up front so the first requests don't pay for the handshakes"""
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if connections <= 0:
+        return
+    opened = await asyncio.gather(*(engine.connect() for _ in range(connections)), return_exceptions=True)
+    for connection in opened:
+        if isinstance(connection, Exception):
+            logger.warning(f"Pool pre-warm connection failed: {connection}")
+        else:
+            await connection.close()
+    logger.info(f"✅ Pre-warmed {engine.pool.checkedin()} database connections")
 
 async def create_database():
     """Create the database if it doesn't exist"""
     # Create a connection without specifying the database
     temp_url = settings.DATABASE_URL.replace(f"/{settings.MYSQL_DATABASE}", "")
-    temp_engine = create_async_engine(
-        temp_url,
-        pool_pre_ping=True,
-        echo=settings.DEBUG if hasattr(settings, 'DEBUG') else False
-    )
+    temp_engine = create_async_engine(temp_url, pool_pre_ping=True, echo=settings.DEBUG)
     
     try:
         async with temp_engine.connect() as conn:
@@ -48,32 +118,39 @@ async def create_database():
 async def init_db_engine():
     global _engine, _async_session_maker
     if _engine is None:
+        engine = create_engine(settings.DATABASE_URL)
         try:
-            _engine = create_async_engine(
-                settings.DATABASE_URL,
-                pool_pre_ping=True,
-                echo=settings.DEBUG if hasattr(settings, 'DEBUG') else False
-            )
             # Test the connection
-            async with _engine.connect() as conn:
+            async with engine.connect() as conn:
                 await conn.execute(text("SELECT 1"))
-            
-            _async_session_maker = async_sessionmaker(_engine, expire_on_commit=False)
-            return _engine
         except Exception as e:
             logger.warning(f"Database connection failed: {e}")
-            if "Unknown database" in str(e):
-                logger.info("Attempting to create database...")
-                await create_database()
-                # Create new engine and session maker after database creation
-                _engine = create_async_engine(
-                    settings.DATABASE_URL,
-                    pool_pre_ping=True,
-                    echo=settings.DEBUG if hasattr(settings, 'DEBUG') else False
-                )
-                _async_session_maker = async_sessionmaker(_engine, expire_on_commit=False)
-                return _engine
-            raise
+            if "Unknown database" not in str(e):
+                await engine.dispose()
+                raise
+            logger.info("Attempting to create database...")
+            await create_database()
+            # Drop the pooled connection that was opened before the database existed
+            await engine.dispose()
+
+        await prewarm_pool(engine, settings.DB_POOL_PREWARM)
+        _engine = engine
+        _async_session_maker = async_sessionmaker(_engine, expire_on_commit=False)
+        await init_replica_engine()
+    return _engine
+
+async def init_replica_engine():
+    """Engine for read-only endpoints; reads stay on the primary when no replica is configured"""
+    global _replica_engine, _replica_session_maker
+    if _replica_engine is None and settings.REPLICA_DATABASE_URL:
+        _replica_engine = create_engine(settings.REPLICA_DATABASE_URL, poolclass=ReplicaQueuePool)
+        _replica_session_maker = async_sessionmaker(_replica_engine, expire_on_commit=False)
+        logger.info("✅ Read replica engine configured")
+    return _replica_engine
+
+def get_replica_engine() -> Optional[AsyncEngine]:
+    return _replica_engine
+
 def get_engine():
     if _engine is None:
         raise RuntimeError("Database engine not initialized. Call init_db_engine() first.")
@@ -84,8 +161,10 @@ def get_async_session_maker():
         raise RuntimeError("Async session maker not initialized. Call init_db_engine() first.")
     return _async_session_maker
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async_session = get_async_session_maker()
+@asynccontextmanager
+async def _session_scope(async_session: async_sessionmaker) -> AsyncGenerator[AsyncSession, None]:
+    # AsyncSession checks a connection out of the pool only when the first statement
+    # runs, so requests answered from caches never touch the pool
     async with async_session() as session:
         try:
             yield session
@@ -93,8 +172,118 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise e
         finally:
+            connected = session.info.pop("connected", False)
+            sessions = _request_sessions.get()
+            if sessions is not None:
+                sessions["opened"] = True
+                sessions["connected"] = sessions["connected"] or connected
             await session.close()
 
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with _session_scope(get_async_session_maker()) as session:
+        yield session
+
+def _recently_wrote(request: Request) -> bool:
+    """Whether this client committed a write within the replica lag window"""
+    last_write = request.cookies.get(LAST_WRITE_COOKIE) or request.headers.get(LAST_WRITE_HEADER)
+    try:
+        return last_write is not None and time.time() - float(last_write) < settings.READ_YOUR_WRITES_SECONDS
+    except ValueError:
+        return False
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the replica, unless this client just wrote to the primary"""
+    if _replica_session_maker is None or _recently_wrote(request):
+        metrics.incr("db.reads_primary")
+        async_session = get_async_session_maker()
+    else:
+        metrics.incr("db.reads_replica")
+        async_session = _replica_session_maker
+    async with _session_scope(async_session) as session:
+        yield session
+
+@event.listens_for(Session, "after_begin")
+def _mark_connected(session, transaction, connection):
+    session.info["connected"] = True
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(Session, "after_commit")
+def _record_commit(session):
+    if session.info.pop("wrote", False):
+        writes = _request_writes.get()
+        if writes is not None:
+            writes["last_write"] = time.time()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("wrote", None)
+
+class ReadYourWritesMiddleware:
+    """Marks clients that just wrote so get_read_db keeps them on the primary until replicas catch up"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _replica_engine is None:
+            await self.app(scope, receive, send)
+            return
+
+        writes: dict = {}
+        token = _request_writes.set(writes)
+
+        async def send_with_last_write(message):
+            if message["type"] == "http.response.start" and "last_write" in writes:
+                value = f"{writes['last_write']:.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(LAST_WRITE_HEADER, value)
+                headers.append(
+                    "Set-Cookie",
+                    f"{LAST_WRITE_COOKIE}={value}; Max-Age={settings.READ_YOUR_WRITES_SECONDS}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_last_write)
+        finally:
+            _request_writes.reset(token)
+
+class SessionMetricsMiddleware:
+    """Counts requests that opened DB sessions by whether any of them checked out a connection.
+
+    A request can open several sessions (e.g. get_read_db plus the auth dependency's
+    get_db), so this is counted here rather than per session.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sessions = {"opened": False, "connected": False}
+        token = _request_sessions.set(sessions)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_sessions.reset(token)
+            if sessions["opened"]:
+                if sessions["connected"]:
+                    metrics.incr("db.requests_with_connection")
+                else:
+                    metrics.incr("db.requests_without_connection")
+
 async def check_db_connection() -> bool:
     engine = get_engine()
     try:
@@ -2,10 +2,11 @@ import asyncio
 from pathlib import Path
 from sqlalchemy import text
 from app.config import settings
-from app.database import get_engine, get_async_session_maker, Base
+from app.database import get_engine, get_async_session_maker
 import logging
-from app.models.user import User
-from app.services.auth import get_password_hash
+# Importing the package registers every model on Base.metadata before create_all
+from app.models import Base, User
+from app.services.auth import aget_password_hash
 
 logger = logging.getLogger(__name__)
 
@@ -39,13 +40,24 @@ async def execute_sql_file(engine, file_path: Path):
         logger.error(f"Error executing SQL file: {e}")
         raise
 
+# Indexes added after the first release; create_all only builds indexes along with a new
+# table, so databases initialised earlier get them here
+UPGRADE_INDEXES = {"appointments": {"idx_appointments_time_id"}}
+
+async def create_missing_indexes(engine):
+    async with engine.begin() as conn:
+        for table_name, index_names in UPGRADE_INDEXES.items():
+            for index in Base.metadata.tables[table_name].indexes:
+                if index.name in index_names:
+                    await conn.run_sync(index.create, checkfirst=True)
+
 async def create_superuser():
     async_session = get_async_session_maker()
     async with async_session() as db:
         try:
             existing_user = await User.get_by_email(db, settings.FIRST_SUPERUSER)
             if not existing_user:
-                hashed_password = get_password_hash(settings.FIRST_SUPERUSER_PASSWORD)
+                hashed_password = await aget_password_hash(settings.FIRST_SUPERUSER_PASSWORD)
                 superuser = User(
                     email=settings.FIRST_SUPERUSER,
                     hashed_password=hashed_password,
@@ -83,6 +95,8 @@ async def init_db():
             except Exception as e:
                 logger.error(f"8Database initialization failed: {e}")
                 raise
+        else:
+            await create_missing_indexes(engine)
     
     # Create superuser using proper session
     await create_superuser()
@@ -1,10 +1,25 @@
 import logging
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import init_db_engine, check_db_connection, get_engine
+from app.database import (
+    init_db_engine,
+    check_db_connection,
+    get_engine,
+    get_replica_engine,
+    ReadYourWritesMiddleware,
+    SessionMetricsMiddleware,
+    LAST_WRITE_HEADER
+)
 from app.api.v1.api_v1 import api_router
+from app.services.auth import get_current_active_admin
 from app.utils.redis_client import redis_client 
+from app.utils.invalidation import invalidation_bus
+from app.utils.metrics import metrics
+from app.utils.operation_log import operation_log
+from app.utils.password_hasher import password_hasher
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.rate_limit import RateLimitMiddleware, RATE_LIMIT_HEADERS
 from app.utils.exceptions import (
     http_exception_handler,
     validation_exception_handler,
@@ -27,12 +42,19 @@ app = FastAPI(
     openapi_url="/api/v1/openapi.json",
 )
 
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(SessionMetricsMiddleware)
+
+# Added before CORS so rejected requests still get CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, LAST_WRITE_HEADER, *RATE_LIMIT_HEADERS],
 )
 
 app.include_router(api_router, prefix="/api/v1", tags=["v1"])
@@ -67,6 +89,10 @@ async def startup_event():
         else:
             logger.info("✅ Redis connection verified successfully")
 
+        # Listen for cache invalidations published by other workers
+        await invalidation_bus.start()
+        await operation_log.start()
+
     except Exception as e:
         logger.error(f"Startup failed: {e}")
         raise
@@ -76,7 +102,13 @@ async def shutdown_event():
     try:
         engine = get_engine()
         await engine.dispose()
+        replica_engine = get_replica_engine()
+        if replica_engine is not None:
+            await replica_engine.dispose()
+        await invalidation_bus.stop()
+        await operation_log.stop()
         await redis_client.disconnect()
+        password_hasher.shutdown()
         logger.info("Shutting down the Tupange HealthCare Appointment Scheduling API...")
     except Exception as e:
         logger.error(f"Shutdown error: {e}")
@@ -111,6 +143,11 @@ async def health_check():
             detail="Health check failed"
         )
 
+@app.get("/metrics", dependencies=[Depends(get_current_active_admin)])
+async def read_metrics():
+    """Process-local counters and timings for this worker"""
+    return metrics.snapshot()
+
 @app.get("/")
 async def root():
     return {
@@ -3,7 +3,7 @@ from .base import Base, BaseModel  # This should now work
 from .user import User
 from .patient import Patient
 from .doctor import Doctor
-from .appointment import Appointment
+from .appointment import Appointment, SlotLedgerEntry
 from .medical_record import MedicalRecord
 
 __all__ = [
@@ -13,5 +13,6 @@ __all__ = [
     'Patient',
     'Doctor',
     'Appointment',
+    'SlotLedgerEntry',
     'MedicalRecord'
 ]
\ No newline at end of file
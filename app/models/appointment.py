@@ -1,5 +1,5 @@
 # models/appointment.py
-from sqlalchemy import Column, Integer, DateTime, String, ForeignKey, Enum
+from sqlalchemy import Column, Integer, DateTime, String, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 from enum import Enum as PyEnum
@@ -12,6 +12,10 @@ class AppointmentStatus(str, PyEnum):
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Keyset pagination orders by (scheduled_time, id)
+        Index("idx_appointments_time_id", "scheduled_time", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)  # Ensure this exists
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -24,4 +28,17 @@ class Appointment(Base):
     
     patient = relationship("Patient", back_populates="appointments")
     doctor = relationship("Doctor", back_populates="appointments")
-    medical_record = relationship("MedicalRecord", back_populates="appointment", uselist=False)
\ No newline at end of file
+    medical_record = relationship("MedicalRecord", back_populates="appointment", uselist=False)
+
+class SlotLedgerEntry(Base):
+    __tablename__ = "appointment_slot_ledger"
+    # Kept in step with db/initial_setup_database.sql
+    __table_args__ = (
+        UniqueConstraint("doctor_id", "slot_start", name="uq_slot_ledger_doctor_slot"),
+        Index("idx_slot_ledger_appointment", "appointment_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    doctor_id = Column(Integer, ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False)
+    slot_start = Column(DateTime, nullable=False)
+    appointment_id = Column(Integer, ForeignKey("appointments.id", ondelete="CASCADE"), nullable=False)
\ No newline at end of file
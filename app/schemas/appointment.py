@@ -42,4 +42,10 @@ class Appointment(AppointmentBase):
 
     class Config:
         from_attributes = True
-        use_enum_values = True
\ No newline at end of file
+        use_enum_values = True
+
+class AppointmentBulkResult(BaseModel):
+    index: int
+    created: bool
+    appointment: Optional[Appointment] = None
+    detail: Optional[str] = None
\ No newline at end of file
@@ -29,9 +29,23 @@ class UserInDB(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: Optional[EmailStr] = None
+    # Present on tokens from create_user_access_token; lets JWT_CLAIMS_AUTH skip the user lookup
+    user_id: Optional[int] = None
+    role: Optional[str] = None
+    is_active: Optional[bool] = None
+    is_superuser: Optional[bool] = None
+    version: Optional[int] = None
+
+    @property
+    def has_user_claims(self) -> bool:
+        return None not in (self.user_id, self.role, self.is_active, self.is_superuser, self.version)
 
 # Add these new schemas for password reset
 class PasswordResetRequest(BaseModel):
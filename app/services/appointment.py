@@ -1,61 +1,410 @@
-from datetime import datetime, timedelta
-from typing import List, Optional
+import heapq
+import logging
+from collections import defaultdict
+from datetime import date as date_type, datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, insert, delete, exists, literal, union_all, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from fastapi import HTTPException, status
-from app.models.appointment import Appointment, AppointmentStatus
-from app.models.doctor import DoctorAvailability
-from app.schemas.appointment import AppointmentCreate, AppointmentUpdate
+from app.models.appointment import Appointment, AppointmentStatus, SlotLedgerEntry
+from app.models.doctor import Doctor, DoctorAvailability
+from app.models.patient import Patient
+from app.schemas.appointment import (
+    Appointment as AppointmentSchema,
+    AppointmentBulkResult,
+    AppointmentCreate,
+    AppointmentUpdate,
+    AppointmentSlot
+)
+from app.config import settings
+from app.utils.appointment_index import appointment_index, DoctorIntervalIndex, naive_datetime
+from app.services.slot_ledger import SlotLedgerService, is_duplicate_key, slot_alignment
+from app.utils.booking_lock import doctor_booking_lock
+from app.utils.cache import SingleFlight
+from app.utils.entity_cache import EntityCache
+from app.utils.pagination import decode_cursor, keyset_after, parse_cursor_datetime
+from app.utils.schedule import schedule_cache, booked_day_masks, iter_bits, minute_of_day
+from app.utils.slot_cache import slot_cache
 from app.utils.exceptions import (
     AppointmentNotFoundException,
+    DoctorNotFoundException,
+    PatientNotFoundException,
     DoctorNotAvailableException,
-    AppointmentConflictException
+    AppointmentConflictException,
+    InvalidSlotRequestException,
+    BulkRequestTooLargeException
 )
 
+logger = logging.getLogger(__name__)
+
+appointment_cache = EntityCache("appointment", AppointmentSchema)
+# Concurrent misses for the same doctor and range share one computation
+slot_flight = SingleFlight("slot_cache")
+
 class AppointmentService:
     @staticmethod
     async def create_appointment(
         db: AsyncSession, 
         appointment_in: AppointmentCreate
     ) -> Appointment:
-        # Check doctor availability
+        if settings.APPOINTMENT_BOOKING_MODE == "ledger":
+            return await AppointmentService._create_appointment_ledger(db, appointment_in)
+
+        async with doctor_booking_lock.hold(appointment_in.doctor_id):
+            # Rejects from the in-process caches are confirmed in SQL; the guarded INSERT re-checks everything
+            if not await AppointmentService.is_doctor_available(
+                db, 
+                appointment_in.doctor_id, 
+                appointment_in.scheduled_time, 
+                appointment_in.end_time
+            ):
+                await AppointmentService._raise_unavailable(db, appointment_in)
+            if settings.APPOINTMENT_CONFLICT_MODE != "sql" and await AppointmentService.has_conflicting_appointment(
+                db,
+                appointment_in.doctor_id,
+                appointment_in.scheduled_time,
+                appointment_in.end_time
+            ):
+                raise AppointmentConflictException(appointment_in.doctor_id)
+
+            appointment = await AppointmentService._insert_appointment_guarded(db, appointment_in)
+            await db.commit()
+            await appointment_index.apply(appointment)
+        await slot_cache.evict_intervals(appointment.doctor_id, [(appointment.scheduled_time, appointment.end_time)])
+        return appointment
+
+    @staticmethod
+    def _booking_guard(appointment_in: AppointmentCreate):
+        """WHERE clause for INSERT ... SELECT: doctor exists, the slot lies inside the
+        doctor's availability windows and no other live appointment overlaps it"""
+        start = naive_datetime(appointment_in.scheduled_time)
+        end = naive_datetime(appointment_in.end_time)
+        start_str = start.strftime("%H:%M")
+        # Appointments crossing midnight are checked up to the end of their first day here;
+        # the compiled schedule has already checked the remaining days
+        end_str = end.strftime("%H:%M") if end.date() == start.date() else "24:00"
+
+        window, boundary, continuation = (aliased(DoctorAvailability) for _ in range(3))
+
+        def open_windows(alias):
+            return and_(
+                alias.doctor_id == appointment_in.doctor_id,
+                alias.day_of_week == start.weekday(),
+                alias.is_available == True
+            )
+
+        covers_start = exists().where(
+            and_(open_windows(window), window.start_time <= start_str, window.end_time > start_str)
+        )
+        # Every window that ends inside the slot must be continued by another window
+        no_gaps = ~exists().where(
+            and_(
+                open_windows(boundary),
+                boundary.end_time > start_str,
+                boundary.end_time < end_str,
+                ~exists().where(
+                    and_(
+                        open_windows(continuation),
+                        continuation.start_time <= boundary.end_time,
+                        continuation.end_time > boundary.end_time
+                    )
+                )
+            )
+        )
+        no_conflict = ~exists().where(
+            and_(
+                Appointment.doctor_id == appointment_in.doctor_id,
+                Appointment.status != AppointmentStatus.CANCELLED,
+                Appointment.scheduled_time < end,
+                Appointment.end_time > start
+            )
+        )
+        doctor_exists = exists().where(Doctor.id == appointment_in.doctor_id)
+        return and_(doctor_exists, covers_start, no_gaps, no_conflict)
+
+    @staticmethod
+    async def _insert_appointment_guarded(
+        db: AsyncSession,
+        appointment_in: AppointmentCreate
+    ) -> Appointment:
+        """Book in a single INSERT ... SELECT and build the result from known values"""
+        values = appointment_in.dict()
+        columns = list(values)
+        source = (
+            select(*(literal(values[name], type_=Appointment.__table__.c[name].type) for name in columns))
+            .select_from(Patient)
+            .where(and_(Patient.id == appointment_in.patient_id, AppointmentService._booking_guard(appointment_in)))
+        )
+        result = await db.execute(insert(Appointment).from_select(columns, source))
+
+        if result.rowcount != 1:
+            await AppointmentService._raise_booking_rejection(db, appointment_in)
+        return Appointment(id=result.lastrowid, **values)
+
+    @staticmethod
+    async def _raise_missing_party(db: AsyncSession, appointment_in: AppointmentCreate) -> None:
+        """404 for an unknown patient or doctor; returns if both exist"""
+        if not await db.get(Patient, appointment_in.patient_id):
+            raise PatientNotFoundException(appointment_in.patient_id)
+        if not await db.get(Doctor, appointment_in.doctor_id):
+            raise DoctorNotFoundException(appointment_in.doctor_id)
+
+    @staticmethod
+    async def _raise_unavailable(db: AsyncSession, appointment_in: AppointmentCreate) -> None:
+        """Unknown parties look unavailable too (an unknown doctor has no windows); only runs on the failure path"""
+        await AppointmentService._raise_missing_party(db, appointment_in)
+        raise DoctorNotAvailableException(appointment_in.doctor_id)
+
+    @staticmethod
+    async def _raise_booking_rejection(db: AsyncSession, appointment_in: AppointmentCreate) -> None:
+        """Work out why the guarded INSERT inserted nothing; only runs on the failure path"""
+        await db.rollback()
+        await AppointmentService._raise_missing_party(db, appointment_in)
+
+        # The caches let this booking through, so make sure they are rebuilt from the table
+        schedule_cache.discard(appointment_in.doctor_id)
+        appointment_index.invalidate(appointment_in.doctor_id)
         if not await AppointmentService.is_doctor_available(
-            db, 
-            appointment_in.doctor_id, 
-            appointment_in.scheduled_time, 
+            db,
+            appointment_in.doctor_id,
+            appointment_in.scheduled_time,
             appointment_in.end_time
         ):
             raise DoctorNotAvailableException(appointment_in.doctor_id)
-            
-        # Check for conflicting appointments
-        if await AppointmentService.has_conflicting_appointment(
+        raise AppointmentConflictException(appointment_in.doctor_id)
+
+    @staticmethod
+    async def _create_appointment_ledger(
+        db: AsyncSession,
+        appointment_in: AppointmentCreate
+    ) -> Appointment:
+        """Book without a lock or range scan; the ledger's unique index rejects conflicts"""
+        if not await AppointmentService.is_doctor_available(
             db,
             appointment_in.doctor_id,
             appointment_in.scheduled_time,
             appointment_in.end_time
         ):
-            raise AppointmentConflictException()
-            
+            await AppointmentService._raise_unavailable(db, appointment_in)
+
         appointment = Appointment(**appointment_in.dict())
         db.add(appointment)
-        await db.commit()
-        await db.refresh(appointment)
+        try:
+            await db.flush()
+        except IntegrityError:
+            # Only a foreign key can reject the row itself (the availability check passes for
+            # any patient id), so report which party is missing instead of a 500
+            await db.rollback()
+            await AppointmentService._raise_missing_party(db, appointment_in)
+            raise
+        await AppointmentService._commit_ledger_claims(
+            db, appointment.doctor_id, SlotLedgerService.claim(db, [appointment])
+        )
+        await appointment_index.apply(appointment)
+        await slot_cache.evict_intervals(appointment.doctor_id, [(appointment.scheduled_time, appointment.end_time)])
         return appointment
 
     @staticmethod
-    async def get_appointment(db: AsyncSession, appointment_id: int) -> Appointment:
+    async def _commit_ledger_claims(db: AsyncSession, doctor_id: int, claims) -> None:
+        """Run a ledger write and commit, turning a duplicate slot into a 409"""
+        try:
+            await claims
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if is_duplicate_key(e):
+                raise AppointmentConflictException(doctor_id)
+            raise
+
+    @staticmethod
+    async def create_appointments_bulk(
+        db: AsyncSession,
+        appointments_in: List[AppointmentCreate]
+    ) -> List[AppointmentBulkResult]:
+        """Validate and insert a batch of appointments with a fixed number of queries"""
+        if len(appointments_in) > settings.APPOINTMENT_BULK_MAX_ITEMS:
+            raise BulkRequestTooLargeException(settings.APPOINTMENT_BULK_MAX_ITEMS)
+        if not appointments_in:
+            return []
+
+        doctor_ids = list({item.doctor_id for item in appointments_in})
+        async with doctor_booking_lock.hold(*doctor_ids):
+            return await AppointmentService._create_appointments_bulk_locked(db, appointments_in, doctor_ids)
+
+    @staticmethod
+    async def _create_appointments_bulk_locked(
+        db: AsyncSession,
+        appointments_in: List[AppointmentCreate],
+        doctor_ids: List[int]
+    ) -> List[AppointmentBulkResult]:
+        # Whole seconds, as DATETIME stores them: the created ids are read back by start time
+        intervals = [
+            (
+                naive_datetime(item.scheduled_time).replace(microsecond=0),
+                naive_datetime(item.end_time).replace(microsecond=0)
+            )
+            for item in appointments_in
+        ]
+        schedules = await schedule_cache.get_many(db, doctor_ids)
+        # Re-read the windows of doctors the cached schedules would reject items for
+        unavailable = {
+            item.doctor_id
+            for item, (start, end) in zip(appointments_in, intervals)
+            if end > start and not schedules[item.doctor_id].is_available(start, end)
+        }
+        if unavailable:
+            schedules.update(await schedule_cache.get_many(db, unavailable, max_age=0))
+
+        # Existing bookings and accepted batch items share one interval index per doctor,
+        # so conflicts inside the batch are caught the same way as conflicts with the table
+        range_start = min(start for start, _ in intervals)
+        range_end = max(end for _, end in intervals)
+        indexes = {doctor_id: DoctorIntervalIndex(range_start) for doctor_id in doctor_ids}
+        booked = await AppointmentService.get_booked_intervals(db, doctor_ids, range_start, range_end)
+        for position, (doctor_id, start, end) in enumerate(booked):
+            indexes[doctor_id].add(-(position + 1), start, end)
+
+        patient_ids, known_doctor_ids = await AppointmentService._existing_party_ids(db, appointments_in)
+
+        results: List[AppointmentBulkResult] = []
+        accepted = []
+        for position, (item, (start, end)) in enumerate(zip(appointments_in, intervals)):
+            if item.patient_id not in patient_ids:
+                detail = PatientNotFoundException(item.patient_id).detail
+            elif item.doctor_id not in known_doctor_ids:
+                detail = DoctorNotFoundException(item.doctor_id).detail
+            elif end <= start:
+                detail = "end_time must be after scheduled_time"
+            elif not schedules[item.doctor_id].is_available(start, end):
+                detail = DoctorNotAvailableException(item.doctor_id).detail
+            elif indexes[item.doctor_id].overlaps(start, end):
+                detail = AppointmentConflictException(item.doctor_id).detail
+            else:
+                indexes[item.doctor_id].add(position, start, end)
+                accepted.append(position)
+                detail = None
+            results.append(AppointmentBulkResult(index=position, created=detail is None, detail=detail))
+
+        if not accepted:
+            return results
+
+        rows = []
+        for position in accepted:
+            start, end = intervals[position]
+            rows.append({**appointments_in[position].dict(), "scheduled_time": start, "end_time": end})
+        await db.execute(insert(Appointment), rows)
+
+        # MySQL can't return generated keys from executemany, so read them back in one query.
+        # An older row with the same doctor and start can only be cancelled (or, in ledger
+        # mode, hold claims), and it has a lower id, so the newest match is ours
+        ledger_mode = settings.APPOINTMENT_BOOKING_MODE == "ledger"
+        created_filter = and_(
+            Appointment.doctor_id.in_({row["doctor_id"] for row in rows}),
+            Appointment.scheduled_time.in_({row["scheduled_time"] for row in rows})
+        )
+        if ledger_mode:
+            # Without the lock another worker may have booked the same start; its row already holds claims
+            created_filter = and_(created_filter, ~exists().where(SlotLedgerEntry.appointment_id == Appointment.id))
+        created = await db.execute(
+            select(Appointment.id, Appointment.doctor_id, Appointment.scheduled_time)
+            .where(created_filter)
+            .order_by(Appointment.id)
+        )
+        ids = {(doctor_id, start): appointment_id for appointment_id, doctor_id, start in created.all()}
+        appointments = [Appointment(id=ids.get((row["doctor_id"], row["scheduled_time"])), **row) for row in rows]
+
+        if ledger_mode:
+            # Single bookings don't take the lock in ledger mode, so the claims are still authoritative
+            taken = await AppointmentService._claim_ledger_slots_bulk(db, appointments)
+            if taken:
+                await db.execute(delete(Appointment).where(Appointment.id.in_([appointments[i].id for i in taken])))
+                for i in taken:
+                    results[accepted[i]].created = False
+                    results[accepted[i]].detail = AppointmentConflictException(appointments[i].doctor_id).detail
+                accepted = [position for i, position in enumerate(accepted) if i not in taken]
+                appointments = [appointment for i, appointment in enumerate(appointments) if i not in taken]
+        await db.commit()
+
+        if not appointments:
+            return results
+        for position, appointment in zip(accepted, appointments):
+            results[position].appointment = AppointmentSchema.model_validate(appointment)
+        await appointment_index.apply_many(appointments)
+        for doctor_id in {appointment.doctor_id for appointment in appointments}:
+            await slot_cache.evict_intervals(doctor_id, [
+                (appointment.scheduled_time, appointment.end_time)
+                for appointment in appointments
+                if appointment.doctor_id == doctor_id
+            ])
+        return results
+
+    @staticmethod
+    async def _existing_party_ids(
+        db: AsyncSession,
+        appointments_in: List[AppointmentCreate]
+    ) -> Tuple[Set[int], Set[int]]:
+        """Which of the batch's patient and doctor ids exist, in one query"""
+        query = union_all(
+            select(literal("patient"), Patient.id).where(Patient.id.in_({item.patient_id for item in appointments_in})),
+            select(literal("doctor"), Doctor.id).where(Doctor.id.in_({item.doctor_id for item in appointments_in}))
+        )
+        patient_ids, doctor_ids = set(), set()
+        for kind, party_id in (await db.execute(query)).all():
+            (patient_ids if kind == "patient" else doctor_ids).add(party_id)
+        return patient_ids, doctor_ids
+
+    @staticmethod
+    async def _claim_ledger_slots_bulk(db: AsyncSession, appointments: List[Appointment]) -> Set[int]:
+        """Claim ledger slots for a batch; returns the indexes of appointments whose slots were taken"""
+        try:
+            async with db.begin_nested():
+                await SlotLedgerService.claim(db, appointments)
+            return set()
+        except IntegrityError as e:
+            if not is_duplicate_key(e):
+                raise
+        # Some slot is taken: claim one appointment at a time to find out which
+        taken = set()
+        for i, appointment in enumerate(appointments):
+            try:
+                async with db.begin_nested():
+                    await SlotLedgerService.claim(db, [appointment])
+            except IntegrityError as e:
+                if not is_duplicate_key(e):
+                    raise
+                taken.add(i)
+        return taken
+
+    @staticmethod
+    async def _get_appointment_row(db: AsyncSession, appointment_id: int) -> Appointment:
         appointment = await db.get(Appointment, appointment_id)
         if not appointment:
             raise AppointmentNotFoundException(appointment_id)
         return appointment
 
+    @staticmethod
+    async def get_appointment(db: AsyncSession, appointment_id: int) -> AppointmentSchema:
+        return await appointment_cache.get_or_load(
+            appointment_id, lambda: AppointmentService._get_appointment_row(db, appointment_id)
+        )
+
     @staticmethod
     async def get_appointments(
         db: AsyncSession, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Appointment]:
-        result = await db.execute(select(Appointment).offset(skip).limit(limit))
+        query = select(Appointment).order_by(Appointment.scheduled_time, Appointment.id)
+        if cursor:
+            values = decode_cursor(cursor, parse_cursor_datetime, int)
+            query = query.where(keyset_after([Appointment.scheduled_time, Appointment.id], values))
+        else:
+            query = query.offset(skip)
+        result = await db.execute(query.limit(limit))
         return result.scalars().all()
 
     @staticmethod
@@ -88,11 +437,29 @@ class AppointmentService:
         appointment_id: int, 
         appointment_in: AppointmentUpdate
     ) -> Appointment:
-        appointment = await AppointmentService.get_appointment(db, appointment_id)
+        appointment = await AppointmentService._get_appointment_row(db, appointment_id)
         update_data = appointment_in.dict(exclude_unset=True)
         
+        # Rescheduling goes through the same critical section as booking
+        rescheduling = 'scheduled_time' in update_data or 'end_time' in update_data
+        if rescheduling and settings.APPOINTMENT_BOOKING_MODE != "ledger":
+            async with doctor_booking_lock.hold(appointment.doctor_id):
+                return await AppointmentService._apply_appointment_update(db, appointment, update_data)
+        return await AppointmentService._apply_appointment_update(db, appointment, update_data)
+
+    @staticmethod
+    async def _apply_appointment_update(
+        db: AsyncSession,
+        appointment: Appointment,
+        update_data: dict
+    ) -> Appointment:
+        appointment_id = appointment.id
+        previous_interval = (appointment.scheduled_time, appointment.end_time)
+        ledger_mode = settings.APPOINTMENT_BOOKING_MODE == "ledger"
+        rescheduling = 'scheduled_time' in update_data or 'end_time' in update_data
+
         # If time is being updated, check availability
-        if 'scheduled_time' in update_data or 'end_time' in update_data:
+        if rescheduling:
             scheduled_time = update_data.get('scheduled_time', appointment.scheduled_time)
             end_time = update_data.get('end_time', appointment.end_time)
             
@@ -105,35 +472,225 @@ class AppointmentService:
             ):
                 raise DoctorNotAvailableException(appointment.doctor_id)
                 
-            if await AppointmentService.has_conflicting_appointment(
+            if not ledger_mode and await AppointmentService.has_conflicting_appointment(
                 db,
                 appointment.doctor_id,
                 scheduled_time,
                 end_time,
                 exclude_appointment_id=appointment_id
             ):
-                raise AppointmentConflictException()
+                raise AppointmentConflictException(appointment.doctor_id)
         
         for field, value in update_data.items():
             setattr(appointment, field, value)
             
-        await db.commit()
-        await db.refresh(appointment)
+        if ledger_mode and (rescheduling or 'status' in update_data):
+            await AppointmentService._commit_ledger_claims(
+                db, appointment.doctor_id, SlotLedgerService.reclaim(db, appointment)
+            )
+        else:
+            await db.commit()
+        await appointment_cache.invalidate(appointment_id)
+        await appointment_index.apply(appointment)
+        await slot_cache.evict_intervals(
+            appointment.doctor_id,
+            [previous_interval, (appointment.scheduled_time, appointment.end_time)]
+        )
         return appointment
 
     @staticmethod
     async def cancel_appointment(db: AsyncSession, appointment_id: int) -> Appointment:
-        appointment = await AppointmentService.get_appointment(db, appointment_id)
+        appointment = await AppointmentService._get_appointment_row(db, appointment_id)
         appointment.status = AppointmentStatus.CANCELLED
+        if settings.APPOINTMENT_BOOKING_MODE == "ledger":
+            await SlotLedgerService.release(db, appointment_id)
         await db.commit()
-        await db.refresh(appointment)
+        await appointment_cache.invalidate(appointment_id)
+        await appointment_index.apply(appointment)
+        await slot_cache.evict_intervals(appointment.doctor_id, [(appointment.scheduled_time, appointment.end_time)])
         return appointment
 
     @staticmethod
     async def delete_appointment(db: AsyncSession, appointment_id: int) -> None:
-        appointment = await AppointmentService.get_appointment(db, appointment_id)
+        appointment = await AppointmentService._get_appointment_row(db, appointment_id)
+        if settings.APPOINTMENT_BOOKING_MODE == "ledger":
+            await SlotLedgerService.release(db, appointment_id)
         await db.delete(appointment)
         await db.commit()
+        await appointment_cache.invalidate(appointment_id)
+        await appointment_index.discard(appointment.doctor_id, appointment_id)
+        await slot_cache.evict_intervals(appointment.doctor_id, [(appointment.scheduled_time, appointment.end_time)])
+
+    @staticmethod
+    def _parse_slot_date(value: str) -> date_type:
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise InvalidSlotRequestException(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    @staticmethod
+    async def get_booked_intervals(
+        db: AsyncSession,
+        doctor_ids: List[int],
+        range_start: datetime,
+        range_end: datetime
+    ) -> List[tuple]:
+        """(doctor_id, start, end) of non-cancelled appointments overlapping the range, in one query"""
+        result = await db.execute(
+            select(Appointment.doctor_id, Appointment.scheduled_time, Appointment.end_time)
+            .where(
+                and_(
+                    Appointment.doctor_id.in_(doctor_ids),
+                    Appointment.status != AppointmentStatus.CANCELLED,
+                    Appointment.scheduled_time < range_end,
+                    Appointment.end_time > range_start
+                )
+            )
+        )
+        return result.all()
+
+    @staticmethod
+    async def get_available_slots(
+        db: AsyncSession,
+        doctor_id: int,
+        date: str,
+        end_date: Optional[str] = None,
+        slot_minutes: Optional[int] = None
+    ) -> List[AppointmentSlot]:
+        """Free slots for a doctor from `date` through `end_date` (inclusive)"""
+        first_day = AppointmentService._parse_slot_date(date)
+        last_day = AppointmentService._parse_slot_date(end_date) if end_date else first_day
+        slot_minutes = slot_minutes or settings.APPOINTMENT_SLOT_MINUTES
+
+        if last_day < first_day:
+            raise InvalidSlotRequestException("end_date must not be before date")
+        if (last_day - first_day).days >= settings.AVAILABLE_SLOTS_MAX_DAYS:
+            raise InvalidSlotRequestException(
+                f"Date range may span at most {settings.AVAILABLE_SLOTS_MAX_DAYS} days"
+            )
+        if not 0 < slot_minutes <= 24 * 60:
+            raise InvalidSlotRequestException("slot_minutes must be between 1 and 1440")
+
+        now = datetime.now()
+        days = [
+            first_day + timedelta(days=offset)
+            for offset in range((last_day - first_day).days + 1)
+            if first_day + timedelta(days=offset) >= now.date()
+        ]
+        if not days:
+            return []
+
+        # Cached days hold the whole day's free slots; only past slots of today are trimmed per request
+        align = slot_alignment()
+        generation, minutes_by_day = await slot_cache.get_many(doctor_id, days, slot_minutes, align)
+        missing = [day for day in days if minutes_by_day[day] is None]
+        if missing:
+            async def compute_missing() -> Dict[date_type, List[int]]:
+                computed = await AppointmentService._compute_slot_minutes(
+                    db, doctor_id, missing[0], missing[-1], slot_minutes, align
+                )
+                fresh = {day: computed[day] for day in missing}
+                await slot_cache.store_many(doctor_id, generation, fresh, slot_minutes, align)
+                return fresh
+
+            # Keyed on every missing day: callers sharing only the endpoints need different days
+            flight_key = (doctor_id, tuple(missing), slot_minutes, align, generation)
+            minutes_by_day.update(await slot_flight.do(flight_key, compute_missing))
+
+        not_before = minute_of_day(now, round_up=True)
+        slot_length = timedelta(minutes=slot_minutes)
+        slots = []
+        for day in days:
+            midnight = datetime.combine(day, datetime.min.time())
+            for minute in minutes_by_day[day]:
+                if day == now.date() and minute < not_before:
+                    continue
+                start = midnight + timedelta(minutes=minute)
+                slots.append(AppointmentSlot(start_time=start, end_time=start + slot_length, doctor_id=doctor_id))
+        return slots
+
+    @staticmethod
+    async def _compute_slot_minutes(
+        db: AsyncSession,
+        doctor_id: int,
+        first_day: date_type,
+        last_day: date_type,
+        slot_minutes: int,
+        align: int = 1
+    ) -> Dict[date_type, List[int]]:
+        """Free slot start minutes for each day in the range, from one availability and one booking fetch"""
+        schedule = await schedule_cache.get(db, doctor_id)
+        range_start = datetime.combine(first_day, datetime.min.time())
+        range_end = datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+        booked = await AppointmentService.get_booked_intervals(db, [doctor_id], range_start, range_end)
+        booked_by_day = booked_day_masks((start, end) for _, start, end in booked)
+
+        minutes_by_day = {}
+        day = first_day
+        while day <= last_day:
+            starts = schedule.free_slot_starts(day, booked_by_day.get(day, 0), slot_minutes, align=align)
+            minutes_by_day[day] = list(iter_bits(starts))
+            day += timedelta(days=1)
+        return minutes_by_day
+
+    @staticmethod
+    def _tag_slots(doctor_id: int, slots: Iterator[tuple]) -> Iterator[tuple]:
+        for start, end in slots:
+            yield start, doctor_id, end
+
+    @staticmethod
+    async def find_earliest_slots(
+        db: AsyncSession,
+        specialization: str,
+        limit: int = 5,
+        days: Optional[int] = None,
+        slot_minutes: Optional[int] = None
+    ) -> List[AppointmentSlot]:
+        """Earliest free slots across every doctor with the given specialization"""
+        days = days or settings.EARLIEST_SLOTS_DEFAULT_DAYS
+        slot_minutes = slot_minutes or settings.APPOINTMENT_SLOT_MINUTES
+        if not 0 < days <= settings.AVAILABLE_SLOTS_MAX_DAYS:
+            raise InvalidSlotRequestException(
+                f"days must be between 1 and {settings.AVAILABLE_SLOTS_MAX_DAYS}"
+            )
+        if not 0 < slot_minutes <= 24 * 60:
+            raise InvalidSlotRequestException("slot_minutes must be between 1 and 1440")
+        if limit <= 0:
+            return []
+
+        result = await db.execute(select(Doctor.id).where(Doctor.specialization == specialization))
+        doctor_ids = result.scalars().all()
+        if not doctor_ids:
+            return []
+
+        first_day = datetime.now().date()
+        last_day = first_day + timedelta(days=days - 1)
+        range_start = datetime.combine(first_day, datetime.min.time())
+        range_end = datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+
+        schedules = await schedule_cache.get_many(db, doctor_ids)
+        align = slot_alignment()
+        booked = defaultdict(list)
+        for doctor_id, start, end in await AppointmentService.get_booked_intervals(
+            db, doctor_ids, range_start, range_end
+        ):
+            booked[doctor_id].append((start, end))
+
+        # Each doctor's slots are generated lazily in order, so merging stops after `limit` items
+        streams = [
+            AppointmentService._tag_slots(
+                doctor_id,
+                schedule.iter_free_slots(
+                    first_day, last_day, booked_day_masks(booked[doctor_id]), slot_minutes, align=align
+                )
+            )
+            for doctor_id, schedule in schedules.items()
+            if any(schedule.days)
+        ]
+        return [
+            AppointmentSlot(start_time=start, end_time=end, doctor_id=doctor_id)
+            for start, doctor_id, end in islice(heapq.merge(*streams), limit)
+        ]
 
     @staticmethod
     async def is_doctor_available(
@@ -143,30 +700,48 @@ class AppointmentService:
         end_time: datetime,
         exclude_appointment_id: Optional[int] = None
     ) -> bool:
-        day_of_week = start_time.weekday()
-        start_time_str = start_time.strftime("%H:%M")
-        end_time_str = end_time.strftime("%H:%M")
-        
-        availability = await db.execute(
-            select(DoctorAvailability)
-            .where(
-                and_(
-                    DoctorAvailability.doctor_id == doctor_id,
-                    DoctorAvailability.day_of_week == day_of_week,
-                    DoctorAvailability.is_available == True,
-                    DoctorAvailability.start_time <= start_time_str,
-                    DoctorAvailability.end_time >= end_time_str
-                )
+        schedule = await schedule_cache.get(db, doctor_id)
+        if schedule.is_available(start_time, end_time):
+            return True
+        # Re-read the windows before rejecting, in case this worker missed an availability change
+        schedule = await schedule_cache.get(db, doctor_id, max_age=0)
+        return schedule.is_available(start_time, end_time)
+
+    @staticmethod
+    async def has_conflicting_appointment(
+        db: AsyncSession,
+        doctor_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_appointment_id: Optional[int] = None
+    ) -> bool:
+        """Check for overlaps using the in-memory index, falling back to (or verifying against) SQL.
+
+        A conflict found in the index is always confirmed in SQL, so a missed invalidation
+        can't turn into a false 409.
+        """
+        mode = settings.APPOINTMENT_CONFLICT_MODE
+        indexed = None
+        if mode != "sql":
+            indexed = await appointment_index.has_conflict(
+                db, doctor_id, start_time, end_time, exclude_appointment_id
             )
+            if indexed is False and mode != "verify":
+                return False
+
+        conflict = await AppointmentService._has_conflicting_appointment_sql(
+            db, doctor_id, start_time, end_time, exclude_appointment_id
         )
-        
-        if not availability.scalar():
-            return False
-            
-        return True
+        if indexed is not None and indexed != conflict:
+            logger.warning(
+                f"Appointment index disagrees with SQL for doctor {doctor_id} "
+                f"({start_time} - {end_time}): index={indexed}, sql={conflict}"
+            )
+            appointment_index.invalidate(doctor_id)
+        return conflict
 
     @staticmethod
-    async def has_conflicting_appointment(
+    async def _has_conflicting_appointment_sql(
         db: AsyncSession,
         doctor_id: int,
         start_time: datetime,
@@ -1,9 +1,14 @@
+import hashlib
+import logging
+import secrets
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
@@ -11,26 +16,188 @@ from app.schemas.user import TokenData, UserInDB
 from app.models.user import User
 from app.database import get_db
 from app.utils.exceptions import credentials_exception
+from app.utils.cache import TwoTierCache
+from app.utils.ttl_cache import TTLCache
+from app.utils.metrics import metrics
+from app.utils.password_hasher import password_hasher, pwd_context
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password."""
+    """Verify a plain password against a hashed password. Blocks; prefer averify_password in handlers."""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
+    """Hash a password using bcrypt. Blocks; prefer aget_password_hash in handlers."""
     return pwd_context.hash(password)
 
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt worker pool without blocking the event loop."""
+    return await password_hasher.verify(plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password on the bcrypt worker pool without blocking the event loop."""
+    return await password_hasher.hash(password)
+
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     user = await User.get_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await averify_password(password, user.hashed_password):
         return None
     return user
 
+TOKEN_VERSIONS_KEY = "token_versions"
+
+async def get_token_version(user_id: int) -> Optional[int]:
+    """Current token version of a user, or None when Redis can't answer"""
+    if not redis_client.is_connected:
+        return None
+    try:
+        version = await redis_client.hget(TOKEN_VERSIONS_KEY, str(user_id))
+    except Exception as e:
+        logger.warning(f"Token version lookup failed: {e}")
+        return None
+    return int(version) if version is not None else 0
+
+async def revoke_user_tokens(user_id: int) -> None:
+    """Reject every access and refresh token issued to the user before now"""
+    try:
+        await redis_client.hincrby(TOKEN_VERSIONS_KEY, str(user_id))
+    except Exception as e:
+        logger.warning(f"Token version bump failed for user {user_id}: {e}")
+    await revoke_refresh_tokens(user_id)
+
+# Swaps the family's current token hash only if the presented one is current;
+# presenting an already rotated token means it leaked, so the family is dropped.
+# A family issued before the user's latest token revocation is dropped as well, even
+# if revoke_refresh_tokens couldn't find it.
+ROTATE_REFRESH_SCRIPT = """
+local family = redis.call('hmget', KEYS[1], 'current', 'user_id', 'ver')
+local current = family[1]
+if not current then
+    return false
+end
+if current ~= ARGV[1] then
+    redis.call('del', KEYS[1])
+    return 0
+end
+local version = tonumber(redis.call('hget', KEYS[2], family[2]) or '0')
+if tonumber(family[3] or '-1') < version then
+    redis.call('del', KEYS[1])
+    return false
+end
+redis.call('hset', KEYS[1], 'current', ARGV[2])
+redis.call('expire', KEYS[1], ARGV[3])
+return redis.call('hget', KEYS[1], 'email')
+"""
+
+def _refresh_family_key(family: str) -> str:
+    return f"refresh_token:{family}"
+
+def _refresh_families_key(user_id: int) -> str:
+    return f"refresh_families:{user_id}"
+
+def _hash_refresh_secret(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+async def create_refresh_token(user: User) -> Optional[str]:
+    """Start a refresh token family for a fresh login; None when Redis is unavailable"""
+    version = await get_token_version(user.id)
+    pipe = redis_client.pipeline()
+    if version is None or pipe is None:
+        return None
+    family, secret = uuid.uuid4().hex, secrets.token_urlsafe(32)
+    ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+    try:
+        pipe.hset(
+            _refresh_family_key(family),
+            mapping={
+                "current": _hash_refresh_secret(secret),
+                "user_id": user.id,
+                "email": user.email,
+                "ver": version
+            }
+        )
+        pipe.expire(_refresh_family_key(family), ttl)
+        pipe.sadd(_refresh_families_key(user.id), family)
+        pipe.expire(_refresh_families_key(user.id), ttl)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Refresh token issue failed for user {user.id}: {e}")
+        return None
+    return f"{family}.{secret}"
+
+async def rotate_refresh_token(db: AsyncSession, refresh_token: str) -> Tuple[User, str]:
+    """Exchange a refresh token for its successor, returning the user it belongs to"""
+    family, _, secret = refresh_token.partition(".")
+    if not family or not secret or not redis_client.is_connected:
+        raise credentials_exception
+
+    new_secret = secrets.token_urlsafe(32)
+    try:
+        email = await redis_client.eval(
+            ROTATE_REFRESH_SCRIPT,
+            [_refresh_family_key(family), TOKEN_VERSIONS_KEY],
+            [_hash_refresh_secret(secret), _hash_refresh_secret(new_secret), settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400]
+        )
+    except Exception as e:
+        logger.warning(f"Refresh token rotation failed: {e}")
+        raise credentials_exception
+    if email == 0:
+        metrics.incr("auth.refresh_reuse_detected")
+        logger.warning(f"Refresh token reuse detected, revoked family {family}")
+        raise credentials_exception
+    if email is None:
+        raise credentials_exception
+
+    user = await get_user_for_auth(db, email=email)
+    if user is None or not user.is_active:
+        await redis_client.delete(_refresh_family_key(family))
+        raise credentials_exception
+    metrics.incr("auth.refresh_rotated")
+    return user, f"{family}.{new_secret}"
+
+async def revoke_refresh_tokens(user_id: int) -> None:
+    try:
+        families = await redis_client.smembers(_refresh_families_key(user_id))
+        await redis_client.delete(
+            _refresh_families_key(user_id),
+            *(_refresh_family_key(family) for family in families)
+        )
+    except Exception as e:
+        logger.warning(f"Refresh token revocation failed for user {user_id}: {e}")
+
+# sha256(token) -> verified claims, each entry expiring with its token
+_decoded_token_cache = TTLCache(maxsize=settings.JWT_CACHE_MAXSIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+metrics.gauge("jwt_cache.size", lambda: len(_decoded_token_cache))
+
+def decode_access_token(token: str) -> dict:
+    """Verify a token's signature and expiry and return its claims; raises JWTError.
+
+    Clients reuse a token for its whole lifetime, so verified claims are cached by token
+    digest until the token's exp. Revocation is unaffected: it is checked against the
+    token version, not here.
+    """
+    if settings.JWT_CACHE_MAXSIZE <= 0:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = _decoded_token_cache.get(digest)
+    if payload is not None:
+        metrics.incr("jwt_cache.hits")
+        return dict(payload)
+
+    metrics.incr("jwt_cache.misses")
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    expires_in = payload["exp"] - time.time() if "exp" in payload else None
+    if expires_in is None or expires_in > 0:
+        _decoded_token_cache.set(digest, payload, ttl=expires_in)
+    return dict(payload)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -41,20 +208,87 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+async def create_user_access_token(user: User, expires_delta: Optional[timedelta] = None) -> str:
+    """Access token carrying the claims get_current_user needs to authorize without a lookup"""
+    version = await get_token_version(user.id)
+    return create_access_token(
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "role": user.role,
+            "act": user.is_active,
+            "su": user.is_superuser,
+            "ver": version or 0,
+        },
+        expires_delta=expires_delta
+    )
+
+# Everything the get_current_active_* dependencies and /auth/me read from the user
+USER_CACHE_FIELDS = ("id", "email", "is_active", "is_superuser", "role")
+
+_user_cache: TwoTierCache[dict] = TwoTierCache(
+    name="user_cache",
+    key_prefix="auth_user:",
+    ttl=settings.USER_CACHE_EXPIRE,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    local_maxsize=settings.USER_CACHE_LOCAL_MAXSIZE
+)
+
+async def get_user_for_auth(db: AsyncSession, email: str) -> Optional[User]:
+    """Load the authenticated user through the in-process and Redis caches.
+
+    Returns a detached User carrying only USER_CACHE_FIELDS; load the row from the
+    session before modifying it.
+    """
+    async def load_fields() -> Optional[dict]:
+        user = await User.get_by_email(db, email)
+        if user is None:
+            return None
+        return {name: getattr(user, name) for name in USER_CACHE_FIELDS}
+
+    fields = await _user_cache.get_or_load(email, load_fields)
+    return User(**fields) if fields is not None else None
+
+async def invalidate_user_cache(*emails: str) -> None:
+    """Evict users from both cache tiers on every worker after a profile, password or status change"""
+    await _user_cache.invalidate(*emails)
+
 async def get_current_user(
     db: AsyncSession = Depends(get_db), 
     token: str = Depends(oauth2_scheme)
 ) -> User:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_access_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
+        token_data = TokenData(
+            email=email,
+            user_id=payload.get("uid"),
+            role=payload.get("role"),
+            is_active=payload.get("act"),
+            is_superuser=payload.get("su"),
+            version=payload.get("ver")
+        )
+    except (JWTError, ValidationError):
         raise credentials_exception
-    
-    user = await User.get_by_email(db, email=token_data.email)
+
+    if settings.JWT_CLAIMS_AUTH and token_data.has_user_claims:
+        current_version = await get_token_version(token_data.user_id)
+        if current_version is not None:
+            if current_version != token_data.version:
+                raise credentials_exception
+            metrics.incr("auth.claims_only")
+            return User(
+                id=token_data.user_id,
+                email=token_data.email,
+                role=token_data.role,
+                is_active=token_data.is_active,
+                is_superuser=token_data.is_superuser
+            )
+        # Redis can't vouch for the token version, so fall back to loading the user
+
+    user = await get_user_for_auth(db, email=token_data.email)
     if user is None:
         raise credentials_exception
     return user
@@ -122,8 +356,10 @@ async def reset_password(db: AsyncSession, token: str, new_password: str):
             detail="User not found"
         )
     
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = await aget_password_hash(new_password)
     await db.commit()
+    await invalidate_user_cache(email)
+    await revoke_user_tokens(user.id)
     
     # Delete the used token
     await redis_client.delete(f"password_reset:{token}")
@@ -4,12 +4,19 @@ from sqlalchemy import select
 from fastapi import HTTPException, status
 from app.models.doctor import Doctor, DoctorAvailability
 from app.schemas.doctor import (
+    Doctor as DoctorSchema,
     DoctorCreate, 
     DoctorUpdate, 
     DoctorAvailabilityCreate, 
-    DoctorAvailability
+    DoctorAvailabilityUpdate
 )
-from app.utils.exceptions import DoctorNotFoundException
+from app.utils.entity_cache import EntityCache
+from app.utils.exceptions import DoctorNotFoundException, AvailabilityNotFoundException
+from app.utils.pagination import decode_cursor
+from app.utils.schedule import schedule_cache
+from app.utils.slot_cache import slot_cache
+
+doctor_cache = EntityCache("doctor", DoctorSchema)
 
 class DoctorService:
     @staticmethod
@@ -17,19 +24,33 @@ class DoctorService:
         doctor = Doctor(**doctor_in.dict())
         db.add(doctor)
         await db.commit()
-        await db.refresh(doctor)
         return doctor
 
     @staticmethod
-    async def get_doctor(db: AsyncSession, doctor_id: int) -> Doctor:
+    async def _get_doctor_row(db: AsyncSession, doctor_id: int) -> Doctor:
         doctor = await db.get(Doctor, doctor_id)
         if not doctor:
             raise DoctorNotFoundException(doctor_id)
         return doctor
 
     @staticmethod
-    async def get_doctors(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Doctor]:
-        result = await db.execute(select(Doctor).offset(skip).limit(limit))
+    async def get_doctor(db: AsyncSession, doctor_id: int) -> DoctorSchema:
+        return await doctor_cache.get_or_load(doctor_id, lambda: DoctorService._get_doctor_row(db, doctor_id))
+
+    @staticmethod
+    async def get_doctors(
+        db: AsyncSession, 
+        skip: int = 0, 
+        limit: int = 100, 
+        cursor: Optional[str] = None
+    ) -> List[Doctor]:
+        query = select(Doctor).order_by(Doctor.id)
+        if cursor:
+            (last_id,) = decode_cursor(cursor, int)
+            query = query.where(Doctor.id > last_id)
+        else:
+            query = query.offset(skip)
+        result = await db.execute(query.limit(limit))
         return result.scalars().all()
 
     @staticmethod
@@ -38,21 +59,22 @@ class DoctorService:
         doctor_id: int, 
         doctor_in: DoctorUpdate
     ) -> Doctor:
-        doctor = await DoctorService.get_doctor(db, doctor_id)
+        doctor = await DoctorService._get_doctor_row(db, doctor_id)
         update_data = doctor_in.dict(exclude_unset=True)
         
         for field, value in update_data.items():
             setattr(doctor, field, value)
             
         await db.commit()
-        await db.refresh(doctor)
+        await doctor_cache.invalidate(doctor_id)
         return doctor
 
     @staticmethod
     async def delete_doctor(db: AsyncSession, doctor_id: int) -> None:
-        doctor = await DoctorService.get_doctor(db, doctor_id)
+        doctor = await DoctorService._get_doctor_row(db, doctor_id)
         await db.delete(doctor)
         await db.commit()
+        await doctor_cache.invalidate(doctor_id)
 
     @staticmethod
     async def add_availability(
@@ -62,9 +84,43 @@ class DoctorService:
         availability = DoctorAvailability(**availability_in.dict())
         db.add(availability)
         await db.commit()
-        await db.refresh(availability)
+        await schedule_cache.invalidate(availability.doctor_id)
+        await slot_cache.evict_weekdays(availability.doctor_id, [availability.day_of_week])
+        return availability
+
+    @staticmethod
+    async def get_availability(db: AsyncSession, availability_id: int) -> DoctorAvailability:
+        availability = await db.get(DoctorAvailability, availability_id)
+        if not availability:
+            raise AvailabilityNotFoundException(availability_id)
         return availability
 
+    @staticmethod
+    async def update_availability(
+        db: AsyncSession, 
+        availability_id: int, 
+        availability_in: DoctorAvailabilityUpdate
+    ) -> DoctorAvailability:
+        availability = await DoctorService.get_availability(db, availability_id)
+        update_data = availability_in.dict(exclude_unset=True)
+        previous_day = availability.day_of_week
+        
+        for field, value in update_data.items():
+            setattr(availability, field, value)
+            
+        await db.commit()
+        await schedule_cache.invalidate(availability.doctor_id)
+        await slot_cache.evict_weekdays(availability.doctor_id, [previous_day, availability.day_of_week])
+        return availability
+
+    @staticmethod
+    async def delete_availability(db: AsyncSession, availability_id: int) -> None:
+        availability = await DoctorService.get_availability(db, availability_id)
+        await db.delete(availability)
+        await db.commit()
+        await schedule_cache.invalidate(availability.doctor_id)
+        await slot_cache.evict_weekdays(availability.doctor_id, [availability.day_of_week])
+
     @staticmethod
     async def get_doctor_availability(
         db: AsyncSession, 
@@ -14,7 +14,6 @@ class MedicalRecordService:
         record = MedicalRecord(**record_in.dict())
         db.add(record)
         await db.commit()
-        await db.refresh(record)
         return record
 
     @staticmethod
@@ -49,7 +48,6 @@ class MedicalRecordService:
             setattr(record, field, value)
             
         await db.commit()
-        await db.refresh(record)
         return record
 
     @staticmethod
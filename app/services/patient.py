@@ -5,9 +5,13 @@ from sqlalchemy import select
 
 from app.models.user import User 
 from app.models.patient import Patient
-from app.schemas.patient import PatientCreate, PatientUpdate
+from app.schemas.patient import Patient as PatientSchema, PatientCreate, PatientUpdate
 from app.utils.exceptions import PatientNotFoundException
-from app.utils.redis_client import redis_client  # Import the Redis client
+from app.utils.pagination import decode_cursor
+from app.utils.entity_cache import EntityCache
+from app.utils.operation_log import operation_log
+
+patient_cache = EntityCache("patient", PatientSchema)
 
 class PatientService:
     @staticmethod
@@ -35,10 +39,9 @@ class PatientService:
         
         db.add(patient)
         await db.commit()
-        await db.refresh(patient)
         
         # Log the operation in Redis
-        await redis_client.log_operation(
+        operation_log.record(
             operation="create_patient",
             key=f"patient:{patient.id}",
             value=f"{patient.first_name} {patient.last_name}"
@@ -47,13 +50,20 @@ class PatientService:
         return patient
 
     @staticmethod
-    async def get_patient(db: AsyncSession, patient_id: int) -> Patient:
+    async def _get_patient_row(db: AsyncSession, patient_id: int) -> Patient:
         patient = await db.get(Patient, patient_id)
         if not patient:
             raise PatientNotFoundException(patient_id)
+        return patient
+
+    @staticmethod
+    async def get_patient(db: AsyncSession, patient_id: int) -> PatientSchema:
+        patient = await patient_cache.get_or_load(
+            patient_id, lambda: PatientService._get_patient_row(db, patient_id)
+        )
         
         # Log the operation in Redis
-        await redis_client.log_operation(
+        operation_log.record(
             operation="get_patient",
             key=f"patient:{patient_id}"
         )
@@ -61,13 +71,24 @@ class PatientService:
         return patient
 
     @staticmethod
-    async def get_patients(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Patient]:
-       result = await db.execute(select(Patient).offset(skip).limit(limit))
+    async def get_patients(
+        db: AsyncSession, 
+        skip: int = 0, 
+        limit: int = 100, 
+        cursor: Optional[str] = None
+    ) -> List[Patient]:
+       query = select(Patient).order_by(Patient.id)
+       if cursor:
+           (last_id,) = decode_cursor(cursor, int)
+           query = query.where(Patient.id > last_id)
+       else:
+           query = query.offset(skip)
+       result = await db.execute(query.limit(limit))
        
        # Log the operation in Redis
-       await redis_client.log_operation(
+       operation_log.record(
            operation="get_patients",
-           value=f"skip:{skip}, limit:{limit}"
+           value=f"cursor:{cursor}, limit:{limit}" if cursor else f"skip:{skip}, limit:{limit}"
        )
        
        return result.scalars().all()
@@ -78,17 +99,17 @@ class PatientService:
         patient_id: int, 
         patient_in: PatientUpdate
     ) -> Patient:
-        patient = await PatientService.get_patient(db, patient_id)
+        patient = await PatientService._get_patient_row(db, patient_id)
         update_data = patient_in.dict(exclude_unset=True)
         
         for field, value in update_data.items():
             setattr(patient, field, value)
             
         await db.commit()
-        await db.refresh(patient)
+        await patient_cache.invalidate(patient_id)
         
         # Log the operation in Redis
-        await redis_client.log_operation(
+        operation_log.record(
             operation="update_patient",
             key=f"patient:{patient_id}",
             value=str(update_data)
@@ -98,12 +119,13 @@ class PatientService:
 
     @staticmethod
     async def delete_patient(db: AsyncSession, patient_id: int) -> None:
-        patient = await PatientService.get_patient(db, patient_id)
+        patient = await PatientService._get_patient_row(db, patient_id)
         await db.delete(patient)
         await db.commit()
+        await patient_cache.invalidate(patient_id)
         
         # Log the operation in Redis
-        await redis_client.log_operation(
+        operation_log.record(
             operation="delete_patient",
             key=f"patient:{patient_id}",
             value=f"{patient.first_name} {patient.last_name}"
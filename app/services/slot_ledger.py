@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.appointment import Appointment, AppointmentStatus, SlotLedgerEntry
+from app.utils.appointment_index import naive_datetime
+
+MYSQL_DUPLICATE_ENTRY = 1062
+
+def ledger_slots(start_time: datetime, end_time: datetime) -> List[datetime]:
+    """Ledger slot starts covered by [start_time, end_time), aligned to SLOT_LEDGER_MINUTES.
+
+    Buckets are aligned to midnight, so in ledger mode two adjacent bookings that meet
+    inside a bucket (e.g. 09:10-09:40 and 09:40-10:10 with 15-minute buckets) conflict
+    even though they don't overlap. Booking times should fall on bucket boundaries;
+    offered slots do (see slot_alignment).
+    """
+    start_time, end_time = naive_datetime(start_time), naive_datetime(end_time)
+    step = timedelta(minutes=settings.SLOT_LEDGER_MINUTES)
+    midnight = datetime.combine(start_time.date(), datetime.min.time())
+    slot = midnight + ((start_time - midnight) // step) * step
+    slots = []
+    while slot < end_time:
+        slots.append(slot)
+        slot += step
+    return slots
+
+def slot_alignment() -> int:
+    """Minute grid offered slots start on: the ledger buckets in ledger mode, any minute otherwise"""
+    return settings.SLOT_LEDGER_MINUTES if settings.APPOINTMENT_BOOKING_MODE == "ledger" else 1
+
+def is_duplicate_key(error: IntegrityError) -> bool:
+    args = getattr(error.orig, "args", ())
+    return bool(args) and args[0] == MYSQL_DUPLICATE_ENTRY
+
+class SlotLedgerService:
+    """Claims (doctor_id, slot_start) rows so the unique index rejects double bookings"""
+
+    @staticmethod
+    def _rows(appointment: Appointment) -> List[dict]:
+        return [
+            {"doctor_id": appointment.doctor_id, "slot_start": slot, "appointment_id": appointment.id}
+            for slot in ledger_slots(appointment.scheduled_time, appointment.end_time)
+        ]
+
+    @staticmethod
+    async def claim(db: AsyncSession, appointments: List[Appointment]) -> None:
+        """Insert claims for the given (flushed) appointments; raises IntegrityError on a taken slot"""
+        rows = [
+            row
+            for appointment in appointments
+            if appointment.status != AppointmentStatus.CANCELLED
+            for row in SlotLedgerService._rows(appointment)
+        ]
+        if rows:
+            await db.execute(insert(SlotLedgerEntry), rows)
+
+    @staticmethod
+    async def release(db: AsyncSession, appointment_id: int) -> None:
+        await db.execute(delete(SlotLedgerEntry).where(SlotLedgerEntry.appointment_id == appointment_id))
+
+    @staticmethod
+    async def reclaim(db: AsyncSession, appointment: Appointment) -> None:
+        """Replace an appointment's claims after a reschedule or status change"""
+        await SlotLedgerService.release(db, appointment.id)
+        await SlotLedgerService.claim(db, [appointment])
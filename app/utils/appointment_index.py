@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.appointment import Appointment, AppointmentStatus
+from app.utils.invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+INDEX_TOPIC = "appointment_index"
+# Appointments that ended before this window are not loaded; older checks go to SQL
+INDEX_LOOKBACK = timedelta(days=1)
+
+def naive_datetime(value: datetime) -> datetime:
+    # DATETIME columns are stored without a zone, so compare wall-clock values
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+class DoctorIntervalIndex:
+    """Non-cancelled appointments of a single doctor, sorted by (start, id)"""
+
+    def __init__(self, horizon: datetime):
+        self.horizon = horizon
+        self._keys: List[Tuple[datetime, int]] = []
+        self._ends: List[datetime] = []
+        self._by_id: Dict[int, Tuple[datetime, datetime]] = {}
+        self._max_duration = timedelta(0)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, appointment_id: int, start: datetime, end: datetime):
+        self.remove(appointment_id)
+        position = bisect_left(self._keys, (start, appointment_id))
+        self._keys.insert(position, (start, appointment_id))
+        self._ends.insert(position, end)
+        self._by_id[appointment_id] = (start, end)
+        if end - start > self._max_duration:
+            self._max_duration = end - start
+
+    def remove(self, appointment_id: int):
+        interval = self._by_id.pop(appointment_id, None)
+        if interval is None:
+            return
+        position = bisect_left(self._keys, (interval[0], appointment_id))
+        del self._keys[position]
+        del self._ends[position]
+
+    def overlaps(self, start: datetime, end: datetime, exclude_id: Optional[int] = None) -> bool:
+        # Walk back from the last appointment starting before `end`; anything starting
+        # more than the longest duration before `start` has necessarily finished.
+        position = bisect_left(self._keys, (end,))
+        earliest = start - self._max_duration
+        while position > 0:
+            position -= 1
+            appointment_start, appointment_id = self._keys[position]
+            if appointment_start < earliest:
+                break
+            if appointment_id != exclude_id and self._ends[position] > start:
+                return True
+        return False
+
+class AppointmentIndex:
+    """Lazily loaded per-doctor interval indexes used for conflict detection.
+
+    Indexes are reloaded APPOINTMENT_INDEX_TTL seconds after they were loaded, which
+    bounds staleness if an invalidation from another worker is missed.
+    """
+
+    def __init__(self):
+        self._doctors: Dict[int, DoctorIntervalIndex] = {}
+        self._loaded_at: Dict[int, float] = {}
+        self._generations: Dict[int, int] = defaultdict(int)
+        self._load_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        invalidation_bus.register(INDEX_TOPIC, self._on_remote_invalidation)
+
+    async def _load(self, db: AsyncSession, doctor_id: int) -> DoctorIntervalIndex:
+        async with self._load_locks[doctor_id]:
+            index = self._cached(doctor_id)
+            if index is not None:
+                return index
+
+            generation = self._generations[doctor_id]
+            horizon = datetime.now() - INDEX_LOOKBACK
+            result = await db.execute(
+                select(Appointment.id, Appointment.scheduled_time, Appointment.end_time)
+                .where(
+                    and_(
+                        Appointment.doctor_id == doctor_id,
+                        Appointment.status != AppointmentStatus.CANCELLED,
+                        Appointment.end_time > horizon
+                    )
+                )
+            )
+            index = DoctorIntervalIndex(horizon)
+            for appointment_id, start, end in result.all():
+                index.add(appointment_id, start, end)
+
+            # A write or invalidation raced with the load; serve this result but don't keep it
+            if self._generations[doctor_id] == generation:
+                self._doctors[doctor_id] = index
+                self._loaded_at[doctor_id] = time.monotonic()
+            return index
+
+    def _cached(self, doctor_id: int) -> Optional[DoctorIntervalIndex]:
+        index = self._doctors.get(doctor_id)
+        if index is not None and time.monotonic() - self._loaded_at[doctor_id] >= settings.APPOINTMENT_INDEX_TTL:
+            self.invalidate(doctor_id)
+            return None
+        return index
+
+    async def has_conflict(
+        self,
+        db: AsyncSession,
+        doctor_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_appointment_id: Optional[int] = None
+    ) -> Optional[bool]:
+        """Answer a conflict check from memory, or None if the interval is outside the index"""
+        start_time, end_time = naive_datetime(start_time), naive_datetime(end_time)
+        index = self._cached(doctor_id) or await self._load(db, doctor_id)
+        if start_time < index.horizon:
+            return None
+        return index.overlaps(start_time, end_time, exclude_appointment_id)
+
+    def _apply_local(self, appointment: Appointment):
+        self._generations[appointment.doctor_id] += 1
+        index = self._doctors.get(appointment.doctor_id)
+        if index is not None:
+            if appointment.status == AppointmentStatus.CANCELLED:
+                index.remove(appointment.id)
+            else:
+                index.add(
+                    appointment.id,
+                    naive_datetime(appointment.scheduled_time),
+                    naive_datetime(appointment.end_time)
+                )
+
+    async def apply(self, appointment: Appointment):
+        """Reflect a committed create/update/cancel in the index and notify other workers"""
+        self._apply_local(appointment)
+        await invalidation_bus.publish(INDEX_TOPIC, appointment.doctor_id)
+
+    async def apply_many(self, appointments: List[Appointment]):
+        """Like apply(), but publishes a single invalidation per affected doctor"""
+        for appointment in appointments:
+            self._apply_local(appointment)
+        for doctor_id in {appointment.doctor_id for appointment in appointments}:
+            await invalidation_bus.publish(INDEX_TOPIC, doctor_id)
+
+    async def discard(self, doctor_id: int, appointment_id: int):
+        """Reflect a committed delete in the index and notify other workers"""
+        self._generations[doctor_id] += 1
+        index = self._doctors.get(doctor_id)
+        if index is not None:
+            index.remove(appointment_id)
+        await invalidation_bus.publish(INDEX_TOPIC, doctor_id)
+
+    def invalidate(self, doctor_id: int):
+        self._generations[doctor_id] += 1
+        self._doctors.pop(doctor_id, None)
+        self._loaded_at.pop(doctor_id, None)
+
+    def _on_remote_invalidation(self, key: str):
+        try:
+            self.invalidate(int(key))
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring appointment index invalidation for {key!r}")
+
+appointment_index = AppointmentIndex()
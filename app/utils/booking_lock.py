@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+from app.config import settings
+from app.utils.exceptions import BookingLockTimeoutException
+from app.utils.metrics import metrics
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def _lock_key(doctor_id: int) -> str:
+    return f"booking_lock:{doctor_id}"
+
+class DoctorBookingLock:
+    """Short per-doctor critical section around check-then-insert booking paths.
+
+    Bookings for one doctor are serialized by an asyncio lock inside the worker and a
+    Redis SET NX lease across workers; different doctors never wait on each other.
+    """
+
+    def __init__(self):
+        self._local_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def _acquire_redis(self, doctor_id: int, token: str, deadline: float) -> bool:
+        delay = 0.005
+        while True:
+            try:
+                acquired = await redis_client.set(
+                    _lock_key(doctor_id), token, px=settings.BOOKING_LOCK_TTL_MS, nx=True
+                )
+            except Exception as e:
+                logger.warning(f"Booking lock for doctor {doctor_id} degraded to in-process: {e}")
+                acquired = None
+            if acquired is None:
+                # Redis unavailable: the in-process lock is all we can offer
+                metrics.incr("booking_lock.redis_fallback")
+                return True
+            if acquired:
+                return True
+            if time.monotonic() + delay > deadline:
+                return False
+            metrics.incr("booking_lock.retries")
+            await asyncio.sleep(delay * (0.5 + random.random()))
+            delay = min(delay * 2, 0.05)
+
+    async def _release_redis(self, doctor_id: int, token: str):
+        try:
+            await redis_client.eval(RELEASE_SCRIPT, [_lock_key(doctor_id)], [token])
+        except Exception as e:
+            logger.warning(f"Failed to release booking lock for doctor {doctor_id}: {e}")
+
+    async def _release(self, doctor_ids: List[int], token: str):
+        # Local locks first and without awaiting, so a second cancellation can't leave one held;
+        # a Redis lease that isn't released expires after BOOKING_LOCK_TTL_MS
+        for doctor_id in doctor_ids:
+            self._local_locks[doctor_id].release()
+        for doctor_id in reversed(doctor_ids):
+            await self._release_redis(doctor_id, token)
+
+    @asynccontextmanager
+    async def hold(self, *doctor_ids: int):
+        """Hold the booking lock for each doctor, acquired in id order to avoid deadlocks"""
+        token = uuid.uuid4().hex
+        started = time.monotonic()
+        deadline = started + settings.BOOKING_LOCK_WAIT_MS / 1000
+        held: List[int] = []
+        try:
+            for doctor_id in sorted(set(doctor_ids)):
+                local_lock = self._local_locks[doctor_id]
+                try:
+                    await asyncio.wait_for(local_lock.acquire(), max(deadline - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    raise BookingLockTimeoutException(doctor_id)
+                # Tracked before the Redis lease so a cancellation while acquiring it still releases
+                # the local lock; releasing a lease we never got is a no-op thanks to the token check
+                held.append(doctor_id)
+                if not await self._acquire_redis(doctor_id, token, deadline):
+                    raise BookingLockTimeoutException(doctor_id)
+        except BaseException as e:
+            if isinstance(e, BookingLockTimeoutException):
+                metrics.incr("booking_lock.timeouts")
+                metrics.observe("booking_lock.wait_seconds", time.monotonic() - started)
+            await self._release(held, token)
+            raise
+
+        metrics.incr("booking_lock.acquired")
+        metrics.observe("booking_lock.wait_seconds", time.monotonic() - started)
+        try:
+            yield
+        finally:
+            await self._release(held, token)
+
+doctor_booking_lock = DoctorBookingLock()
@@ -0,0 +1,290 @@
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.config import settings
+from app.utils.invalidation import invalidation_bus
+from app.utils.metrics import metrics
+from app.utils.redis_client import redis_client
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Deletes a lease only if we still hold it
+RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Writes a loaded value only if no invalidation bumped the key's generation since the load began
+STORE_LOADED_SCRIPT = """
+if (redis.call('get', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('setex', KEYS[1], ARGV[2], ARGV[3])
+return 1
+"""
+
+BUMP_GENERATION_SCRIPT = """
+local generation = redis.call('incr', KEYS[1])
+redis.call('expire', KEYS[1], ARGV[1])
+return generation
+"""
+
+class _LeaderCancelled(Exception):
+    pass
+
+class SingleFlight:
+    """Collapses concurrent loads of the same key in this process into one.
+
+    The first caller runs the loader; callers arriving while it is in flight await the
+    same future. If the first caller is cancelled, the waiters run the loader themselves.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        future = self._inflight.get(key)
+        if future is not None:
+            metrics.incr(f"{self.name}.coalesced")
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                return await self.do(key, load)
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting; don't let an unobserved failure log "exception never retrieved"
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            value = await load()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+class TwoTierCache(Generic[T]):
+    """Per-process TTLCache in front of Redis, kept coherent across workers by the invalidation bus.
+
+    Reads try local memory, then Redis (repopulating local memory), then the loader.
+    invalidate() evicts both tiers here and broadcasts the key so every other worker
+    drops its local copy; local TTLs only bound staleness if a broadcast is missed.
+
+    Misses are loaded once per key: concurrent callers in a process share one load, and
+    a short Redis lease makes other workers wait for that result instead of querying too.
+    Redis entries also carry how long they took to compute, so a hot key is recomputed
+    probabilistically shortly before it expires (XFetch) rather than by everyone at expiry.
+
+    invalidate() bumps a per-key generation in Redis (and a per-cache one in memory); a
+    load that raced with it is returned to its caller but not cached.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key_prefix: str,
+        ttl: int,
+        local_ttl: float,
+        local_maxsize: int,
+        encode: Callable[[T], str] = json.dumps,
+        decode: Callable[[str], T] = json.loads
+    ):
+        self.name = name
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self.encode = encode
+        self.decode = decode
+        self.local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self.flight = SingleFlight(name)
+        self._local_generation = 0
+        invalidation_bus.register(f"cache:{name}", self._on_remote_invalidation)
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def _lease_key(self, key: str) -> str:
+        return f"lease:{self.key_prefix}{key}"
+
+    def _generation_key(self, key: str) -> str:
+        return f"gen:{self.key_prefix}{key}"
+
+    def _entry(self, value: T, compute_seconds: float) -> str:
+        # "<compute seconds> <expiry timestamp> <payload>"
+        return f"{compute_seconds:.6f} {time.time() + self.ttl:.3f} {self.encode(value)}"
+
+    async def _read_redis(self, key: str) -> Tuple[Optional[T], bool]:
+        """Value stored in Redis and whether this caller should refresh it early"""
+        try:
+            raw = await redis_client.get(self._redis_key(key))
+        except Exception as e:
+            logger.warning(f"{self.name} read failed for {key}: {e}")
+            return None, False
+        if raw is None:
+            return None, False
+        try:
+            delta, expiry, payload = raw.split(" ", 2)
+            delta, expiry = float(delta), float(expiry)
+        except ValueError:
+            return None, False
+        # XFetch: refresh when now - delta * beta * ln(rand) crosses the expiry
+        beta = settings.CACHE_EARLY_REFRESH_BETA
+        refresh = beta > 0 and time.time() - delta * beta * math.log(1.0 - random.random()) >= expiry
+        return self.decode(payload), refresh
+
+    async def get(self, key) -> Optional[T]:
+        key = str(key)
+        value = self.local.get(key)
+        if value is not None:
+            metrics.incr(f"{self.name}.local_hits")
+            return value
+
+        value, _ = await self._read_redis(key)
+        if value is None:
+            metrics.incr(f"{self.name}.misses")
+            return None
+        metrics.incr(f"{self.name}.redis_hits")
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key, value: T, compute_seconds: float = 0.0) -> None:
+        key = str(key)
+        self.local.set(key, value)
+        try:
+            await redis_client.setex(self._redis_key(key), self.ttl, self._entry(value, compute_seconds))
+        except Exception as e:
+            logger.warning(f"{self.name} write failed for {key}: {e}")
+
+    async def get_or_load(self, key, load: Callable[[], Awaitable[Optional[T]]]) -> Optional[T]:
+        """Cached value, or the loader's result (cached unless None)"""
+        key = str(key)
+        value = self.local.get(key)
+        if value is not None:
+            metrics.incr(f"{self.name}.local_hits")
+            return value
+
+        value, refresh = await self._read_redis(key)
+        if value is not None and not refresh:
+            metrics.incr(f"{self.name}.redis_hits")
+            self.local.set(key, value)
+            return value
+
+        if value is not None:
+            metrics.incr(f"{self.name}.early_refreshes")
+        else:
+            metrics.incr(f"{self.name}.misses")
+        return await self.flight.do(key, lambda: self._load_with_lease(key, load, stale=value))
+
+    async def _load_with_lease(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Optional[T]]],
+        stale: Optional[T] = None
+    ) -> Optional[T]:
+        token = uuid.uuid4().hex
+        try:
+            leased = await redis_client.set(self._lease_key(key), token, px=settings.CACHE_LEASE_MS, nx=True)
+        except Exception as e:
+            logger.warning(f"{self.name} lease failed for {key}: {e}")
+            leased = None
+
+        if leased is False:
+            # Another worker is loading this key: serve what we have, or wait for its result
+            if stale is not None:
+                return stale
+            metrics.incr(f"{self.name}.lease_waits")
+            deadline = time.monotonic() + settings.CACHE_LEASE_WAIT_MS / 1000
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                value, _ = await self._read_redis(key)
+                if value is not None:
+                    self.local.set(key, value)
+                    return value
+
+        try:
+            local_generation = self._local_generation
+            generation = await self._read_generation(key)
+            started = time.perf_counter()
+            value = await load()
+            if value is not None:
+                await self._store_loaded(
+                    key, value, time.perf_counter() - started, generation, local_generation
+                )
+            return value
+        finally:
+            if leased:
+                try:
+                    await redis_client.eval(RELEASE_LEASE_SCRIPT, [self._lease_key(key)], [token])
+                except Exception as e:
+                    logger.warning(f"{self.name} lease release failed for {key}: {e}")
+
+    async def _read_generation(self, key: str) -> Optional[str]:
+        """The key's generation in Redis, or None when Redis can't answer"""
+        if not redis_client.is_connected:
+            return None
+        try:
+            generation = await redis_client.get(self._generation_key(key))
+        except Exception as e:
+            logger.warning(f"{self.name} generation read failed for {key}: {e}")
+            return None
+        return generation or "0"
+
+    async def _store_loaded(
+        self,
+        key: str,
+        value: T,
+        compute_seconds: float,
+        generation: Optional[str],
+        local_generation: int
+    ) -> None:
+        """Cache a freshly loaded value unless an invalidation raced with the load"""
+        if self._local_generation != local_generation:
+            metrics.incr(f"{self.name}.stale_writes_skipped")
+            return
+        if generation is not None:
+            try:
+                stored = await redis_client.eval(
+                    STORE_LOADED_SCRIPT,
+                    [self._redis_key(key), self._generation_key(key)],
+                    [generation, self.ttl, self._entry(value, compute_seconds)]
+                )
+            except Exception as e:
+                logger.warning(f"{self.name} write failed for {key}: {e}")
+                stored = None
+            if stored == 0:
+                metrics.incr(f"{self.name}.stale_writes_skipped")
+                return
+        self.local.set(key, value)
+
+    async def invalidate(self, *keys) -> None:
+        self._local_generation += 1
+        for key in {str(key) for key in keys}:
+            self.local.pop(key)
+            try:
+                await redis_client.delete(self._redis_key(key))
+                # Loads already in flight read the old generation, so they won't store their result
+                await redis_client.eval(BUMP_GENERATION_SCRIPT, [self._generation_key(key)], [self.ttl])
+            except Exception as e:
+                logger.warning(f"{self.name} eviction failed for {key}: {e}")
+            await invalidation_bus.publish(f"cache:{self.name}", key)
+
+    def _on_remote_invalidation(self, key: str) -> None:
+        self._local_generation += 1
+        self.local.pop(key)
@@ -0,0 +1,44 @@
+from typing import Awaitable, Callable, Generic, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.utils.cache import TwoTierCache
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+class EntityCache(Generic[SchemaT]):
+    """Read-through two-tier cache of one entity's response schema, keyed by id.
+
+    Redis holds the schema's JSON and the local tier the validated schema, so a hit
+    never touches the ORM. Entities listed in ENTITY_CACHE_DISABLED bypass the cache.
+    """
+
+    def __init__(self, name: str, schema: Type[SchemaT]):
+        self.name = name
+        self.schema = schema
+        self.cache: TwoTierCache[SchemaT] = TwoTierCache(
+            name=f"entity_cache.{name}",
+            key_prefix=f"entity:{name}:",
+            ttl=settings.REDIS_CACHE_EXPIRE,
+            local_ttl=settings.ENTITY_CACHE_LOCAL_TTL,
+            local_maxsize=settings.ENTITY_CACHE_LOCAL_MAXSIZE,
+            encode=lambda value: value.model_dump_json(),
+            decode=schema.model_validate_json
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.name not in settings.ENTITY_CACHE_DISABLED
+
+    async def get_or_load(self, entity_id: int, load: Callable[[], Awaitable[object]]) -> SchemaT:
+        """Return the cached schema, or build it from load() (which raises if missing) and cache it"""
+        async def load_schema() -> SchemaT:
+            return self.schema.model_validate(await load())
+
+        if not self.enabled:
+            return await load_schema()
+        return await self.cache.get_or_load(entity_id, load_schema)
+
+    async def invalidate(self, entity_id: int) -> None:
+        await self.cache.invalidate(entity_id)
@@ -1,5 +1,6 @@
 from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
+from typing import Optional
 
 class PatientNotFoundException(HTTPException):
     def __init__(self, patient_id: int):
@@ -25,6 +26,12 @@ class MedicalRecordNotFoundException(HTTPException):
             status_code = status.HTTP_404_NOT_FOUND,
             detail = f"Medical record with id {record_id} not found"
         )
+class AvailabilityNotFoundException(HTTPException):
+    def __init__(self, availability_id: int):
+        super().__init__(
+            status_code = status.HTTP_404_NOT_FOUND,
+            detail = f"Availability slot with id {availability_id} not found"
+        )
 
 class DoctorNotAvailableException(HTTPException):
     def __init__(self, doctor_id: int):
@@ -34,12 +41,47 @@ class DoctorNotAvailableException(HTTPException):
         )
 
 class AppointmentConflictException(HTTPException):
-    def __init__(self, doctor_id: int):
+    def __init__(self, doctor_id: Optional[int] = None):
         super().__init__(
             status_code = status.HTTP_409_CONFLICT,
             detail = f"Appointment time conflict with doctor with an existing appointment"
         )
 
+class InvalidSlotRequestException(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = detail
+        )
+
+class BulkRequestTooLargeException(HTTPException):
+    def __init__(self, max_items: int):
+        super().__init__(
+            status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail = f"Bulk requests are limited to {max_items} items"
+        )
+
+class BookingLockTimeoutException(HTTPException):
+    def __init__(self, doctor_id: int):
+        super().__init__(
+            status_code = status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail = f"Doctor with id {doctor_id} is handling another booking, please retry"
+        )
+
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = "Invalid pagination cursor"
+        )
+
+class PasswordHasherBusyException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code = status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail = "Too many authentication requests in progress, please retry"
+        )
+
 credentials_exception = HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,
     detail="Could not validate credentials",
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Callable, Dict, Optional
+
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "tupange:invalidate"
+
+class InvalidationBus:
+    """Broadcasts in-process cache invalidations to the other workers over Redis pub/sub"""
+
+    def __init__(self):
+        self.instance_id = uuid.uuid4().hex
+        self._handlers: Dict[str, Callable[[str], None]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, topic: str, handler: Callable[[str], None]):
+        self._handlers[topic] = handler
+
+    async def publish(self, topic: str, key):
+        message = json.dumps({"origin": self.instance_id, "topic": topic, "key": str(key)})
+        await redis_client.publish(INVALIDATION_CHANNEL, message)
+
+    def _dispatch(self, raw: str):
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed invalidation message: {raw!r}")
+            return
+        # Our own writes have already been applied locally
+        if message.get("origin") == self.instance_id:
+            return
+        handler = self._handlers.get(message.get("topic"))
+        if handler:
+            handler(message.get("key"))
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(redis_client.listen(INVALIDATION_CHANNEL, self._dispatch))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,37 @@
+from collections import defaultdict
+from typing import Callable, Dict
+
+class Metrics:
+    """Process-local counters, timings and gauges, exposed on /metrics"""
+
+    def __init__(self):
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def incr(self, name: str, value: int = 1):
+        self._counters[name] += value
+
+    def observe(self, name: str, value: float):
+        timing = self._timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        timing["count"] += 1
+        timing["total"] += value
+        timing["max"] = max(timing["max"], value)
+
+    def gauge(self, name: str, read: Callable[[], float]):
+        self._gauges[name] = read
+
+    def snapshot(self) -> dict:
+        timings = {
+            name: {**timing, "avg": timing["total"] / timing["count"] if timing["count"] else 0.0}
+            for name, timing in self._timings.items()
+        }
+        gauges = {}
+        for name, read in self._gauges.items():
+            try:
+                gauges[name] = read()
+            except Exception:
+                gauges[name] = None
+        return {"counters": dict(self._counters), "timings": timings, "gauges": gauges}
+
+metrics = Metrics()
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from app.config import settings
+from app.utils.metrics import metrics
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+class OperationLog:
+    """Append-only audit trail of service operations, written to a Redis Stream in the background.
+
+    record() only appends to a bounded in-process ring buffer, so logging never waits on
+    Redis. A background task drains the buffer in batches with pipelined XADDs. When the
+    buffer is full the oldest entry is dropped and counted.
+    """
+
+    def __init__(self, stream: str, buffer_size: int, batch_size: int, flush_interval: float, stream_maxlen: int):
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stream_maxlen = stream_maxlen
+        self._buffer: Deque[Dict[str, str]] = deque(maxlen=buffer_size)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        metrics.gauge("operation_log.buffered", lambda: len(self._buffer))
+
+    def record(self, operation: str, key: Optional[str] = None, value: Optional[str] = None) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            metrics.incr("operation_log.dropped_overflow")
+        entry = {"op": operation, "ts": f"{time.time():.3f}"}
+        if key:
+            entry["key"] = key
+        if value:
+            entry["value"] = str(value)[:1000]
+        self._buffer.append(entry)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _take_batch(self) -> List[Dict[str, str]]:
+        count = min(self.batch_size, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(count)]
+
+    async def _write(self, batch: List[Dict[str, str]]) -> None:
+        pipe = redis_client.pipeline()
+        if pipe is None:
+            metrics.incr("operation_log.dropped_unavailable", len(batch))
+            return
+        try:
+            for entry in batch:
+                pipe.xadd(self.stream, entry, maxlen=self.stream_maxlen, approximate=True)
+            await pipe.execute()
+            metrics.incr("operation_log.written", len(batch))
+        except Exception as e:
+            metrics.incr("operation_log.dropped_failed", len(batch))
+            logger.warning(f"Operation log write of {len(batch)} entries failed: {e}")
+
+    async def flush(self) -> None:
+        while self._buffer:
+            await self._write(self._take_batch())
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background writer and push out whatever is still buffered"""
+        if self._task is not None:
+            # Let an in-flight batch finish rather than cancelling it halfway
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        await self.flush()
+
+operation_log = OperationLog(
+    stream=settings.OPERATION_LOG_STREAM,
+    buffer_size=settings.OPERATION_LOG_BUFFER_SIZE,
+    batch_size=settings.OPERATION_LOG_BATCH_SIZE,
+    flush_interval=settings.OPERATION_LOG_FLUSH_INTERVAL,
+    stream_maxlen=settings.OPERATION_LOG_STREAM_MAXLEN
+)
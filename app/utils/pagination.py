@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Sequence
+
+from fastapi import Response
+from sqlalchemy import and_, or_
+
+from app.utils.exceptions import InvalidCursorException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key of the last row on a page"""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, converting each value with its parser"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("unexpected cursor shape")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursorException()
+
+def set_next_cursor(response: Response, items: Sequence, limit: int, key: Callable[[Any], Sequence]) -> None:
+    """Advertise the cursor for the following page when this page came back full"""
+    if items and len(items) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(items[-1]))
+
+def parse_cursor_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+def keyset_after(columns: Sequence, values: Sequence):
+    """Row-value comparison (c1, c2, ...) > (v1, v2, ...) written with AND/OR so MySQL can use the index"""
+    clauses = []
+    for position, (column, value) in enumerate(zip(columns, values)):
+        equal_prefix = [c == v for c, v in zip(columns[:position], values[:position])]
+        clauses.append(and_(*equal_prefix, column > value))
+    return or_(*clauses)
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.utils.exceptions import PasswordHasherBusyException
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated thread pool so hashing never blocks the event loop.
+
+    bcrypt releases the GIL while it works, so threads give real parallelism and
+    login throughput scales with PASSWORD_HASH_WORKERS. Requests beyond
+    PASSWORD_HASH_MAX_PENDING queued jobs are rejected with 503 instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0  # submitted and not yet finished, only touched on the event loop
+        self.running = 0  # executing on a worker thread, guarded by _running_lock
+        self._running_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        metrics.gauge("password_hasher.queue_depth", lambda: max(self.pending - self.running, 0))
+        metrics.gauge("password_hasher.running", lambda: self.running)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _run(self, fn: Callable[..., T], *args) -> T:
+        with self._running_lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._running_lock:
+                self.running -= 1
+
+    async def _submit(self, name: str, fn: Callable[..., T], *args) -> T:
+        if self.pending >= self.workers + self.max_pending:
+            metrics.incr("password_hasher.rejected")
+            raise PasswordHasherBusyException()
+        self.pending += 1
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(self._get_executor(), self._run, fn, *args)
+        try:
+            return await future
+        finally:
+            self.pending -= 1
+            metrics.observe(f"password_hasher.{name}_seconds", time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit("hash", pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit("verify", pwd_context.verify, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
@@ -0,0 +1,193 @@
+import logging
+import math
+import time
+from typing import Dict, List, NamedTuple, Tuple
+
+from jose import JWTError
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.utils.metrics import metrics
+from app.utils.redis_client import redis_client
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_HEADERS = ["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy", "Retry-After"]
+API_PREFIX = "/api/"
+
+# Sliding window counter: the previous fixed window is weighted by how much of it still
+# overlaps the sliding window. Only counts a request if it fits, so rejected bursts are free.
+SLIDING_WINDOW_SCRIPT = """
+local previous = tonumber(redis.call('get', KEYS[1]) or '0')
+local current = tonumber(redis.call('get', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+if previous * (window - elapsed) / window + current + 1 > limit then
+    return {0, previous, current}
+end
+current = redis.call('incr', KEYS[2])
+if current == 1 then
+    redis.call('pexpire', KEYS[2], window * 2)
+end
+return {1, previous, current}
+"""
+
+class RateLimitPolicy(NamedTuple):
+    limit: int
+    window: int  # seconds
+    scope: str = "user"  # user (falls back to ip for anonymous requests) | ip
+
+    @classmethod
+    def parse(cls, spec: str, scope: str = "user") -> "RateLimitPolicy":
+        """Parse "limit/seconds" or "limit/seconds/scope", e.g. "10/60/ip" """
+        parts = spec.split("/")
+        return cls(int(parts[0]), int(parts[1]), parts[2] if len(parts) > 2 else scope)
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    policy: RateLimitPolicy
+    remaining: int
+    reset: int  # seconds until the counted window rolls over
+    retry_after: int
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.policy.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset),
+            "RateLimit-Policy": f"{self.policy.limit};w={self.policy.window}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+def _retry_after_ms(limit: int, window: int, elapsed: int, previous: int, current: int) -> float:
+    """Time until one more request fits under the weighted count"""
+    if current + 1 <= limit and previous:
+        # Only the previous window's tail is in the way; wait for its weight to decay
+        return max(window * (previous - (limit - 1 - current)) / previous - elapsed, 0)
+    wait = window - elapsed
+    if current:
+        wait += window * max(0, current - (limit - 1)) / current
+    return wait
+
+class RateLimiter:
+    """Per-route sliding-window limits in Redis, with per-process counting while Redis is down"""
+
+    def __init__(self):
+        auth = RateLimitPolicy.parse(settings.RATE_LIMIT_AUTH, scope="ip")
+        routes = {
+            # bcrypt-heavy or enumeration-prone endpoints share the hardened auth preset
+            "/api/v1/auth/token": auth,
+            "/api/v1/auth/register": auth,
+            "/api/v1/auth/password-reset": auth,
+        }
+        routes.update({prefix: RateLimitPolicy.parse(spec) for prefix, spec in settings.RATE_LIMIT_ROUTES.items()})
+        # Longest prefix first so specific routes win over their parents
+        self.routes: List[Tuple[str, RateLimitPolicy]] = sorted(routes.items(), key=lambda item: -len(item[0]))
+        self.default = RateLimitPolicy.parse(settings.RATE_LIMIT_DEFAULT)
+        self._local = TTLCache(maxsize=100_000, ttl=60)
+
+    def policy_for(self, path: str) -> Tuple[str, RateLimitPolicy]:
+        for prefix, policy in self.routes:
+            if path.startswith(prefix):
+                return prefix, policy
+        return "default", self.default
+
+    async def hit(self, route: str, policy: RateLimitPolicy, identity: str) -> RateLimitDecision:
+        window = policy.window * 1000
+        now = int(time.time() * 1000)
+        window_start = now - now % window
+        elapsed = now - window_start
+        base = f"rate_limit:{route}:{identity}"
+        keys = [f"{base}:{window_start - window}", f"{base}:{window_start}"]
+
+        result = None
+        try:
+            result = await redis_client.eval(SLIDING_WINDOW_SCRIPT, keys, [policy.limit, window, elapsed])
+        except Exception as e:
+            logger.warning(f"Rate limit check failed, counting locally: {e}")
+        if result is None:
+            metrics.incr("rate_limit.local_fallback")
+            result = self._hit_local(keys, policy.limit, window, elapsed)
+
+        allowed, previous, current = (int(value) for value in result)
+        used = previous * (window - elapsed) / window + current
+        retry_after = 0
+        if not allowed:
+            metrics.incr("rate_limit.rejected")
+            retry_after = max(1, math.ceil(_retry_after_ms(policy.limit, window, elapsed, previous, current) / 1000))
+        return RateLimitDecision(
+            allowed=bool(allowed),
+            policy=policy,
+            remaining=max(0, math.floor(policy.limit - used)),
+            reset=math.ceil((window - elapsed) / 1000),
+            retry_after=retry_after
+        )
+
+    def _hit_local(self, keys: List[str], limit: int, window: int, elapsed: int) -> Tuple[int, int, int]:
+        previous = self._local.get(keys[0], 0)
+        current = self._local.get(keys[1], 0)
+        if previous * (window - elapsed) / window + current + 1 > limit:
+            return 0, previous, current
+        self._local.set(keys[1], current + 1, ttl=window * 2 / 1000)
+        return 1, previous, current + 1
+
+rate_limiter = RateLimiter()
+
+def _client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def _identity(request: Request, policy: RateLimitPolicy) -> str:
+    if policy.scope == "user":
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            # Imported here: the auth service depends on utils, not the other way round
+            from app.services.auth import decode_access_token
+            try:
+                payload = decode_access_token(token)
+                user = payload.get("uid") or payload.get("sub")
+                if user:
+                    return f"user:{user}"
+            except JWTError:
+                pass
+    return f"ip:{_client_ip(request)}"
+
+class RateLimitMiddleware:
+    """Applies rate_limiter to every API request and adds the RateLimit-* headers"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or not scope["path"].startswith(API_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        route, policy = rate_limiter.policy_for(scope["path"])
+        decision = await rate_limiter.hit(route, policy, _identity(request, policy))
+        headers = decision.headers()
+
+        if not decision.allowed:
+            response = JSONResponse(status_code=429, content={"detail": "Too many requests"}, headers=headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                for name, value in headers.items():
+                    response_headers.append(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,53 +1,269 @@
-import aioredis
+import asyncio
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable, List, Optional, Union
+from redis import asyncio as aioredis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
 from app.config import settings
+from app.utils.metrics import metrics
+from app.utils.ttl_cache import TTLCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Errors that say Redis is unreachable or stalled, as opposed to a bad command
+UNAVAILABLE_ERRORS = (RedisConnectionError, RedisTimeoutError, asyncio.TimeoutError, OSError)
+
+class CircuitBreaker:
+    """Stops calling Redis after repeated failures, then lets a single probe through after a cool-down"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    @property
+    def available(self) -> bool:
+        """Whether allow() would let a call through right now, without claiming the probe"""
+        if self.state == self.CLOSED:
+            return True
+        if self.probing:
+            return False
+        return self.state == self.HALF_OPEN or time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def allow(self) -> bool:
+        """Claim permission for one call; while half-open only the probe gets it"""
+        if not self.available:
+            return False
+        if self.state != self.CLOSED:
+            if self.state == self.OPEN:
+                self.state = self.HALF_OPEN
+                logger.info("Redis circuit half-open, probing")
+            self.probing = True
+        return True
+
+    def release_probe(self):
+        """The probe ended without telling us anything (cancelled); let the next caller probe"""
+        self.probing = False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("✅ Redis circuit closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Redis circuit opened after {self.failures} failures")
+                metrics.incr("redis.circuit_opened")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+class GuardedPipeline:
+    """Non-transactional pipeline whose execute() goes through the client's timeout and breaker"""
+
+    def __init__(self, client: "RedisClient", pipe):
+        self._client = client
+        self._pipe = pipe
+
+    def __getattr__(self, name):
+        # Queued commands are forwarded untouched; only execute() talks to Redis
+        return getattr(self._pipe, name)
+
+    async def execute(self) -> list:
+        if not self._client._allow():
+            raise RedisConnectionError("Redis circuit is open")
+        return await self._client._guard(self._pipe.execute())
+
 class RedisClient:
     def __init__(self):
         self.redis = None
-        self.is_connected = False
+        self.pool = None
+        self.breaker = CircuitBreaker(settings.REDIS_BREAKER_FAILURES, settings.REDIS_BREAKER_RESET_SECONDS)
+        # Process-local stand-in for get/setex/delete while Redis is down
+        self.fallback = (
+            TTLCache(maxsize=settings.REDIS_MEMORY_FALLBACK_MAXSIZE, ttl=settings.REDIS_MEMORY_FALLBACK_MAX_TTL)
+            if settings.REDIS_MEMORY_FALLBACK else None
+        )
+        metrics.gauge("redis.circuit_open", lambda: int(self.breaker.state == CircuitBreaker.OPEN))
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether commands should be sent to Redis right now; does not change the breaker"""
+        return self.redis is not None and self.breaker.available
+
+    def _allow(self) -> bool:
+        """Claim the right to send one command, which must then go through _guard"""
+        return self.redis is not None and self.breaker.allow()
 
     async def connect(self):
+        self.pool = aioredis.BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            health_check_interval=30
+        )
+        self.redis = aioredis.Redis(connection_pool=self.pool)
         try:
-            self.redis = aioredis.from_url(
-                settings.REDIS_URL,
-                decode_responses=True
-            )
-            await self.redis.ping()
-            self.is_connected = True
+            await self._guard(self.redis.ping())
             logger.info("✅ Redis connected successfully")
         except Exception as e:
+            # Keep the client: the breaker retries it once the cool-down has passed
             logger.error(f"❌ Redis connection failed: {e}")
-            self.is_connected = False
 
     async def disconnect(self):
         if self.redis:
-            await self.redis.close()
-            self.is_connected = False
+            await self.redis.aclose()
+            await self.pool.disconnect()
+            self.redis = None
             logger.info("Redis connection closed")
 
-    async def log_operation(self, operation: str, key: str = None, value: str = None):
+    async def _guard(self, awaitable: Awaitable):
+        """Run one Redis call with the per-command timeout, feeding the circuit breaker"""
+        try:
+            result = await asyncio.wait_for(awaitable, timeout=settings.REDIS_COMMAND_TIMEOUT)
+        except UNAVAILABLE_ERRORS:
+            metrics.incr("redis.errors")
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Redis answered with an error, or we were cancelled: no verdict on availability
+            self.breaker.release_probe()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _call(self, command: str, *args, **kwargs):
+        return await self._guard(getattr(self.redis, command)(*args, **kwargs))
+
+    @staticmethod
+    def _seconds(ttl: Union[int, timedelta]) -> int:
+        return int(ttl.total_seconds()) if isinstance(ttl, timedelta) else int(ttl)
+
+    async def get(self, key: str) -> Optional[str]:
+        if self._allow():
+            try:
+                return await self._call("get", key)
+            except UNAVAILABLE_ERRORS:
+                if self.fallback is None:
+                    raise
+        if self.fallback is not None:
+            metrics.incr("redis.fallback_reads")
+            return self.fallback.get(key)
+        return None
+
+    async def setex(self, key: str, ttl, value: str):
+        if self._allow():
+            try:
+                return await self._call("setex", key, ttl, value)
+            except UNAVAILABLE_ERRORS:
+                if self.fallback is None:
+                    raise
+        if self.fallback is not None:
+            metrics.incr("redis.fallback_writes")
+            self.fallback.set(key, value, ttl=min(self._seconds(ttl), settings.REDIS_MEMORY_FALLBACK_MAX_TTL))
+            return True
+        return None
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return None
+        if self.fallback is not None:
+            # Also drop fallback copies so they can't resurface during a later outage
+            for key in keys:
+                self.fallback.pop(key)
+        if not self._allow():
+            return None
+        try:
+            return await self._call("delete", *keys)
+        except UNAVAILABLE_ERRORS as e:
+            # The keys stay in Redis until they expire; callers must not fail a finished write over it
+            logger.warning(f"Redis delete of {len(keys)} keys failed: {e}")
+            return None
+
+    async def set(self, key: str, value: str, ex: int = None, px: int = None, nx: bool = False) -> Optional[bool]:
+        """SET with optional expiry; None when Redis is unavailable, False when NX lost"""
+        if not self._allow():
+            return None
+        return bool(await self._call("set", key, value, ex=ex, px=px, nx=nx))
+
+    async def eval(self, script: str, keys: List[str], args: List):
+        if not self._allow():
+            return None
+        return await self._call("eval", script, len(keys), *keys, *args)
+
+    def pipeline(self) -> Optional[GuardedPipeline]:
+        """Non-transactional pipeline for batching commands, or None when Redis is unavailable"""
         if not self.is_connected:
-            logger.warning("Redis not connected - operation not logged")
+            return None
+        return GuardedPipeline(self, self.redis.pipeline(transaction=False))
+
+    async def hget(self, key: str, field: str) -> Optional[str]:
+        if not self._allow():
+            return None
+        return await self._call("hget", key, field)
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        if not self._allow():
+            return None
+        return await self._call("hincrby", key, field, amount)
+
+    async def smembers(self, key: str) -> set:
+        if not self._allow():
+            return set()
+        return await self._call("smembers", key)
+
+    async def publish(self, channel: str, message: str):
+        if not self._allow():
             return
-        
-        log_message = f"Redis {operation}"
-        if key:
-            log_message += f" - key: {key}"
-        if value:
-            log_message += f" - value: {value[:50]}"  # Truncate long values
-        
-        logger.info(log_message)
-        await self.redis.set(f"log:{operation}:{key}", str(value)[:1000], ex=86400)  # Store for 24h
+        try:
+            await self._call("publish", channel, message)
+        except Exception as e:
+            logger.warning(f"Redis publish to {channel} failed: {e}")
+
+    async def listen(self, channel: str, handler: Callable[[str], None]):
+        """Call handler for every message published on channel until cancelled"""
+        while True:
+            if not self.is_connected:
+                await asyncio.sleep(1)
+                continue
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(channel)
+                while True:
+                    # Poll with a timeout so the socket timeout never fires on an idle channel
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message.get("type") == "message":
+                        handler(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis subscription to {channel} dropped: {e}")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
 
     async def is_healthy(self) -> bool:
         try:
             if self.redis:
-                return await self.redis.ping()
+                return await self._guard(self.redis.ping())
             return False
         except Exception:
             return False
 
-redis_client = RedisClient()
\ No newline at end of file
+redis_client = RedisClient()
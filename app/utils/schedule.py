@@ -0,0 +1,252 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from time import monotonic
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.doctor import DoctorAvailability
+from app.utils.invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_TOPIC = "doctor_schedule"
+MINUTES_PER_DAY = 24 * 60
+
+def parse_hhmm(value: str) -> int:
+    """Convert an "HH:MM" availability string to minutes since midnight"""
+    hours, minutes = value.split(":")
+    return min(max(int(hours) * 60 + int(minutes), 0), MINUTES_PER_DAY)
+
+def window_mask(start_minute: int, end_minute: int) -> int:
+    """Bitset with one bit per minute in [start_minute, end_minute)"""
+    if end_minute <= start_minute:
+        return 0
+    return ((1 << (end_minute - start_minute)) - 1) << start_minute
+
+def minute_of_day(value: datetime, round_up: bool = False) -> int:
+    minute = value.hour * 60 + value.minute
+    if round_up and (value.second or value.microsecond):
+        minute += 1
+    return minute
+
+def round_up(minute: int, step: int) -> int:
+    return -(-minute // step) * step
+
+def iter_runs(mask: int) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) minute ranges of consecutive set bits, lowest first"""
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        shifted = mask >> start
+        length = (~shifted & (shifted + 1)).bit_length() - 1
+        yield start, start + length
+        mask &= ~window_mask(start, start + length)
+
+def iter_bits(mask: int) -> Iterator[int]:
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+def fitting_starts(free: int, length: int) -> int:
+    """Bits s of `free` such that all of s .. s + length - 1 are set"""
+    fits, span = free, 1
+    while span < length and fits:
+        step = min(span, length - span)
+        fits &= fits >> step
+        span += step
+    return fits
+
+def booked_day_masks(intervals: Iterable[Tuple[datetime, datetime]]) -> Dict[date, int]:
+    """Fold booked (start, end) intervals into one minute bitset per calendar day"""
+    masks: Dict[date, int] = defaultdict(int)
+    for start, end in intervals:
+        current = start
+        while current < end:
+            next_midnight = datetime.combine(current.date() + timedelta(days=1), time.min)
+            segment_end = min(end, next_midnight)
+            last_minute = MINUTES_PER_DAY if segment_end == next_midnight else minute_of_day(segment_end, round_up=True)
+            masks[current.date()] |= window_mask(minute_of_day(current), last_minute)
+            current = segment_end
+    return masks
+
+class CompiledSchedule:
+    """A doctor's weekly availability as one minute bitset per weekday (0 = Monday)"""
+
+    __slots__ = ("doctor_id", "days", "compiled_at", "_grids")
+
+    def __init__(self, doctor_id: int, days: Tuple[int, ...]):
+        self.doctor_id = doctor_id
+        self.days = days
+        self.compiled_at = monotonic()
+        self._grids: Dict[Tuple[int, int], int] = {}
+
+    @classmethod
+    def compile(cls, doctor_id: int, rows: Iterable[DoctorAvailability]) -> "CompiledSchedule":
+        days = [0] * 7
+        for row in rows:
+            if not row.is_available:
+                continue
+            try:
+                days[row.day_of_week] |= window_mask(parse_hhmm(row.start_time), parse_hhmm(row.end_time))
+            except (ValueError, IndexError):
+                logger.warning(f"Skipping malformed availability row {row.id} for doctor {doctor_id}")
+        return cls(doctor_id, tuple(days))
+
+    def is_available(self, start_time: datetime, end_time: datetime) -> bool:
+        """True if every minute of [start_time, end_time) falls inside an availability window"""
+        if end_time <= start_time:
+            return False
+        current = start_time
+        while current < end_time:
+            next_midnight = datetime.combine(current.date() + timedelta(days=1), time.min, current.tzinfo)
+            segment_end = min(end_time, next_midnight)
+            last_minute = MINUTES_PER_DAY if segment_end == next_midnight else minute_of_day(segment_end, round_up=True)
+            wanted = window_mask(minute_of_day(current), last_minute)
+            if self.days[current.weekday()] & wanted != wanted:
+                return False
+            current = segment_end
+        return True
+
+    def slot_grid(self, weekday: int, slot_minutes: int, align: int = 1) -> int:
+        """Candidate slot starts: every slot_minutes from the start of each availability window.
+
+        With align > 1 the first start of a window is rounded up to a multiple of align and
+        the step up to the next multiple of align, so every start lies on that grid.
+        """
+        key = (weekday, slot_minutes, align)
+        grid = self._grids.get(key)
+        if grid is None:
+            grid = 0
+            step = round_up(slot_minutes, align)
+            for start, end in iter_runs(self.days[weekday]):
+                for minute in range(round_up(start, align), end - slot_minutes + 1, step):
+                    grid |= 1 << minute
+            self._grids[key] = grid
+        return grid
+
+    def free_slot_starts(
+        self,
+        day: date,
+        booked: int,
+        slot_minutes: int,
+        not_before: int = 0,
+        align: int = 1
+    ) -> int:
+        """Bitset of minutes on `day` where a slot_minutes slot fits around the booked minutes.
+
+        With align > 1 a slot also needs the rest of its last align-minute block unbooked,
+        since ledger bookings claim whole blocks.
+        """
+        weekday = day.weekday()
+        free = self.days[weekday] & ~booked & ~((1 << not_before) - 1)
+        starts = fitting_starts(free, slot_minutes) & self.slot_grid(weekday, slot_minutes, align)
+        if align > 1:
+            starts &= fitting_starts(window_mask(0, MINUTES_PER_DAY) & ~booked, round_up(slot_minutes, align))
+        return starts
+
+    def iter_free_slots(
+        self,
+        first_day: date,
+        last_day: date,
+        booked_by_day: Dict[date, int],
+        slot_minutes: int,
+        now: Optional[datetime] = None,
+        align: int = 1
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """Lazily yield free (start, end) slots in chronological order, one day at a time"""
+        now = now or datetime.now()
+        slot_length = timedelta(minutes=slot_minutes)
+        day = max(first_day, now.date())
+        while day <= last_day:
+            not_before = minute_of_day(now, round_up=True) if day == now.date() else 0
+            starts = self.free_slot_starts(day, booked_by_day.get(day, 0), slot_minutes, not_before, align)
+            midnight = datetime.combine(day, time.min)
+            for minute in iter_bits(starts):
+                start = midnight + timedelta(minutes=minute)
+                yield start, start + slot_length
+            day += timedelta(days=1)
+
+class ScheduleCache:
+    """In-process cache of compiled doctor schedules, invalidated on availability changes.
+
+    Schedules are recompiled SCHEDULE_CACHE_TTL seconds after they were compiled, which
+    bounds staleness if an invalidation from another worker is missed.
+    """
+
+    def __init__(self):
+        self._schedules: Dict[int, CompiledSchedule] = {}
+        self._generations: Dict[int, int] = defaultdict(int)
+        self._lock = asyncio.Lock()
+        invalidation_bus.register(SCHEDULE_TOPIC, self._on_remote_invalidation)
+
+    def _cached(self, doctor_id: int, max_age: Optional[float] = None) -> Optional[CompiledSchedule]:
+        schedule = self._schedules.get(doctor_id)
+        if max_age is None:
+            max_age = settings.SCHEDULE_CACHE_TTL
+        if schedule is not None and monotonic() - schedule.compiled_at >= max_age:
+            return None
+        return schedule
+
+    async def get(self, db: AsyncSession, doctor_id: int, max_age: Optional[float] = None) -> CompiledSchedule:
+        """Return the doctor's schedule, recompiling it if it is older than max_age seconds"""
+        schedule = self._cached(doctor_id, max_age)
+        if schedule is None:
+            schedule = (await self.get_many(db, [doctor_id], max_age))[doctor_id]
+        return schedule
+
+    async def get_many(
+        self,
+        db: AsyncSession,
+        doctor_ids: Iterable[int],
+        max_age: Optional[float] = None
+    ) -> Dict[int, CompiledSchedule]:
+        """Return schedules for all doctor_ids, compiling the missing ones with a single query"""
+        doctor_ids = set(doctor_ids)
+        schedules = {}
+        for doctor_id in doctor_ids:
+            schedule = self._cached(doctor_id, max_age)
+            if schedule is not None:
+                schedules[doctor_id] = schedule
+        missing = doctor_ids - schedules.keys()
+        if not missing:
+            return schedules
+
+        async with self._lock:
+            generations = {i: self._generations[i] for i in missing}
+            result = await db.execute(
+                select(DoctorAvailability).where(DoctorAvailability.doctor_id.in_(missing))
+            )
+            rows_by_doctor = defaultdict(list)
+            for row in result.scalars().all():
+                rows_by_doctor[row.doctor_id].append(row)
+
+            for doctor_id in missing:
+                schedule = CompiledSchedule.compile(doctor_id, rows_by_doctor[doctor_id])
+                schedules[doctor_id] = schedule
+                # Don't keep a schedule that an availability change raced with
+                if self._generations[doctor_id] == generations[doctor_id]:
+                    self._schedules[doctor_id] = schedule
+        return schedules
+
+    def discard(self, doctor_id: int):
+        """Drop this worker's copy only, e.g. when SQL disagrees with the compiled schedule"""
+        self._generations[doctor_id] += 1
+        self._schedules.pop(doctor_id, None)
+
+    async def invalidate(self, doctor_id: int):
+        """Drop a doctor's compiled schedule here and on every other worker"""
+        self.discard(doctor_id)
+        await invalidation_bus.publish(SCHEDULE_TOPIC, doctor_id)
+
+    def _on_remote_invalidation(self, key: str):
+        try:
+            self.discard(int(key))
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring schedule invalidation for {key!r}")
+
+schedule_cache = ScheduleCache()
@@ -1,9 +1,7 @@
-from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
 from app.config import settings
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.utils.password_hasher import pwd_context
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
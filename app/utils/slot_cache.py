@@ -0,0 +1,128 @@
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.metrics import metrics
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Writes only land if no eviction bumped the doctor's generation since the read
+STORE_SCRIPT = """
+local current = redis.call('get', KEYS[1]) or '0'
+if current ~= ARGV[1] then
+    return 0
+end
+local ttl = tonumber(ARGV[2])
+local field = ARGV[3]
+local count = #KEYS - 2
+for i = 1, count do
+    redis.call('hset', KEYS[i + 2], field, ARGV[3 + i])
+    redis.call('expire', KEYS[i + 2], ttl)
+    redis.call('sadd', KEYS[2], ARGV[3 + count + i])
+end
+redis.call('expire', KEYS[2], ttl)
+return 1
+"""
+
+def _day_key(doctor_id: int, day: date) -> str:
+    return f"slots:{doctor_id}:{day.isoformat()}"
+
+def _days_key(doctor_id: int) -> str:
+    return f"slots:{doctor_id}:days"
+
+def _generation_key(doctor_id: int) -> str:
+    return f"slots:{doctor_id}:generation"
+
+def _field(slot_minutes: int, align: int) -> str:
+    return str(slot_minutes) if align == 1 else f"{slot_minutes}/{align}"
+
+def days_spanned(start_time: datetime, end_time: datetime) -> List[date]:
+    last_day = (end_time - timedelta(microseconds=1)).date() if end_time > start_time else start_time.date()
+    return [start_time.date() + timedelta(days=i) for i in range((last_day - start_time.date()).days + 1)]
+
+class SlotCache:
+    """Redis cache of free slot start minutes per (doctor_id, date), one hash field per granularity and alignment"""
+
+    async def get_many(
+        self,
+        doctor_id: int,
+        days: List[date],
+        slot_minutes: int,
+        align: int = 1
+    ) -> Tuple[Optional[str], Dict[date, Optional[List[int]]]]:
+        """Return the doctor's cache generation and the cached minutes (or None) for each day"""
+        pipe = redis_client.pipeline()
+        if pipe is None:
+            return None, {day: None for day in days}
+        try:
+            pipe.get(_generation_key(doctor_id))
+            for day in days:
+                pipe.hget(_day_key(doctor_id, day), _field(slot_minutes, align))
+            generation, *values = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Slot cache read failed for doctor {doctor_id}: {e}")
+            return None, {day: None for day in days}
+
+        cached = {day: json.loads(value) if value is not None else None for day, value in zip(days, values)}
+        hits = sum(value is not None for value in cached.values())
+        metrics.incr("slot_cache.hits", hits)
+        metrics.incr("slot_cache.misses", len(days) - hits)
+        return generation or "0", cached
+
+    async def store_many(
+        self,
+        doctor_id: int,
+        generation: Optional[str],
+        minutes_by_day: Dict[date, List[int]],
+        slot_minutes: int,
+        align: int = 1
+    ) -> None:
+        if generation is None or not minutes_by_day:
+            return
+        days = list(minutes_by_day)
+        keys = [_generation_key(doctor_id), _days_key(doctor_id)] + [_day_key(doctor_id, day) for day in days]
+        args = [generation, settings.REDIS_CACHE_EXPIRE, _field(slot_minutes, align)]
+        args += [json.dumps(minutes_by_day[day]) for day in days]
+        args += [day.isoformat() for day in days]
+        try:
+            stored = await redis_client.eval(STORE_SCRIPT, keys, args)
+            if not stored:
+                metrics.incr("slot_cache.stale_writes_skipped")
+        except Exception as e:
+            logger.warning(f"Slot cache write failed for doctor {doctor_id}: {e}")
+
+    async def evict_days(self, doctor_id: int, days: Iterable[date]) -> None:
+        """Drop the cached slots of specific dates, e.g. those touched by an appointment"""
+        days = set(days)
+        pipe = redis_client.pipeline()
+        if pipe is None:
+            return
+        try:
+            # Bumping the generation also discards results computed before this change
+            pipe.incr(_generation_key(doctor_id))
+            if days:
+                pipe.delete(*(_day_key(doctor_id, day) for day in days))
+                pipe.srem(_days_key(doctor_id), *(day.isoformat() for day in days))
+            await pipe.execute()
+            metrics.incr("slot_cache.evictions", len(days))
+        except Exception as e:
+            logger.warning(f"Slot cache eviction failed for doctor {doctor_id}: {e}")
+
+    async def evict_intervals(self, doctor_id: int, intervals: Iterable[Tuple[datetime, datetime]]) -> None:
+        await self.evict_days(doctor_id, {day for start, end in intervals for day in days_spanned(start, end)})
+
+    async def evict_weekdays(self, doctor_id: int, weekdays: Iterable[int]) -> None:
+        """Drop every cached date falling on the given weekdays, after an availability change"""
+        weekdays = set(weekdays)
+        try:
+            cached_days = await redis_client.smembers(_days_key(doctor_id))
+        except Exception as e:
+            logger.warning(f"Slot cache lookup failed for doctor {doctor_id}: {e}")
+            return
+        days = {date.fromisoformat(value) for value in cached_days}
+        await self.evict_days(doctor_id, {day for day in days if day.weekday() in weekdays})
+
+slot_cache = SlotCache()
@@ -96,6 +96,18 @@ CREATE TABLE IF NOT EXISTS medical_records (
     FOREIGN KEY (appointment_id) REFERENCES appointments(id) ON DELETE SET NULL
 ) ENGINE=InnoDB;
 
+-- One row per (doctor, slot) claimed by an appointment when APPOINTMENT_BOOKING_MODE=ledger
+CREATE TABLE IF NOT EXISTS appointment_slot_ledger (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    doctor_id INT NOT NULL,
+    slot_start DATETIME NOT NULL,
+    appointment_id INT NOT NULL,
+    UNIQUE KEY uq_slot_ledger_doctor_slot (doctor_id, slot_start),
+    INDEX idx_slot_ledger_appointment (appointment_id),
+    FOREIGN KEY (doctor_id) REFERENCES doctors(id) ON DELETE CASCADE,
+    FOREIGN KEY (appointment_id) REFERENCES appointments(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
 -- Create indexes for performance
 CREATE INDEX idx_appointments_doctor ON appointments(doctor_id);
 CREATE INDEX idx_appointments_patient ON appointments(patient_id);
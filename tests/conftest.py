@@ -0,0 +1,60 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base, Doctor, Patient, User
+from app.models.doctor import DoctorAvailability
+from app.utils.appointment_index import appointment_index
+from app.utils.schedule import schedule_cache
+
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    """A session on a fresh SQLite database with the app's tables and foreign keys enforced"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    event.listen(engine.sync_engine, "connect", _enable_foreign_keys)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session = AsyncSession(engine, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        await session.close()
+        await engine.dispose()
+
+@pytest_asyncio.fixture
+async def parties(db):
+    """One patient and one doctor who is available 08:00-17:00 every day"""
+    doctor_user = User(email="doctor@example.com", hashed_password="x", role="doctor")
+    patient_user = User(email="patient@example.com", hashed_password="x", role="patient")
+    db.add_all([doctor_user, patient_user])
+    await db.flush()
+    doctor = Doctor(
+        user_id=doctor_user.id, first_name="Test", last_name="Doctor",
+        specialization="general", phone_number="0700000000"
+    )
+    patient = Patient(
+        user_id=patient_user.id, first_name="Test", last_name="Patient",
+        date_of_birth=date(1990, 1, 1), gender="other", phone_number="0711111111"
+    )
+    db.add_all([doctor, patient])
+    await db.flush()
+    db.add_all([
+        DoctorAvailability(doctor_id=doctor.id, day_of_week=day, start_time="08:00", end_time="17:00")
+        for day in range(7)
+    ])
+    await db.commit()
+    # Every test database reuses the same ids, so don't let the process-wide caches carry over
+    doctor_id = doctor.id
+    schedule_cache.discard(doctor_id)
+    appointment_index.invalidate(doctor_id)
+    yield SimpleNamespace(patient=patient, doctor=doctor)
+    schedule_cache.discard(doctor_id)
+    appointment_index.invalidate(doctor_id)
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models import Appointment, SlotLedgerEntry
+from app.models.appointment import AppointmentStatus
+from app.schemas.appointment import AppointmentCreate
+from app.services.appointment import AppointmentService
+
+MONDAY = datetime(2030, 1, 7)
+
+@pytest.fixture(params=["lock", "ledger"], autouse=True)
+def booking_mode(request, monkeypatch):
+    monkeypatch.setattr(settings, "APPOINTMENT_BOOKING_MODE", request.param)
+    return request.param
+
+def _item(parties, start: datetime, end: datetime, **fields) -> AppointmentCreate:
+    return AppointmentCreate(
+        patient_id=parties.patient.id, doctor_id=parties.doctor.id, scheduled_time=start, end_time=end, **fields
+    )
+
+async def _stored(db, appointment_id: int) -> Appointment:
+    return (await db.execute(select(Appointment).where(Appointment.id == appointment_id))).scalar_one()
+
+@pytest.mark.asyncio
+async def test_bulk_ids_survive_fractional_seconds(db, parties, booking_mode):
+    results = await AppointmentService.create_appointments_bulk(db, [
+        _item(parties, MONDAY.replace(hour=9, microsecond=600_000), MONDAY.replace(hour=9, minute=30)),
+        _item(parties, MONDAY.replace(hour=10), MONDAY.replace(hour=10, minute=30, microsecond=250_000)),
+    ])
+
+    assert [result.created for result in results] == [True, True]
+    first, second = (result.appointment for result in results)
+    assert first.scheduled_time == MONDAY.replace(hour=9)
+    assert second.end_time == MONDAY.replace(hour=10, minute=30)
+    assert (await _stored(db, first.id)).scheduled_time == MONDAY.replace(hour=9)
+    assert (await _stored(db, second.id)).scheduled_time == MONDAY.replace(hour=10)
+    if booking_mode == "ledger":
+        claims = (await db.execute(select(SlotLedgerEntry.appointment_id))).scalars().all()
+        assert sorted(set(claims)) == sorted([first.id, second.id])
+
+@pytest.mark.asyncio
+async def test_bulk_ids_next_to_a_cancelled_booking_at_the_same_start(db, parties):
+    cancelled = Appointment(
+        patient_id=parties.patient.id, doctor_id=parties.doctor.id, status=AppointmentStatus.CANCELLED,
+        scheduled_time=MONDAY.replace(hour=9), end_time=MONDAY.replace(hour=9, minute=30)
+    )
+    db.add(cancelled)
+    await db.commit()
+
+    results = await AppointmentService.create_appointments_bulk(db, [
+        _item(parties, MONDAY.replace(hour=9), MONDAY.replace(hour=9, minute=30)),
+        _item(parties, MONDAY.replace(hour=11), MONDAY.replace(hour=11, minute=30), status=AppointmentStatus.CANCELLED),
+    ])
+
+    assert [result.created for result in results] == [True, True]
+    booked, cancelled_item = (result.appointment for result in results)
+    assert booked.id != cancelled.id
+    assert (await _stored(db, booked.id)).status == AppointmentStatus.SCHEDULED
+    assert (await _stored(db, cancelled_item.id)).scheduled_time == MONDAY.replace(hour=11)
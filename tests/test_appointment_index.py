@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from app.utils.appointment_index import DoctorIntervalIndex
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2024, 1, 1, hour, minute)
+
+def _index(*intervals) -> DoctorIntervalIndex:
+    index = DoctorIntervalIndex(_at(0))
+    for appointment_id, (start, end) in enumerate(intervals, start=1):
+        index.add(appointment_id, start, end)
+    return index
+
+def test_touching_intervals_do_not_overlap():
+    index = _index((_at(9), _at(9, 30)))
+    assert not index.overlaps(_at(9, 30), _at(10))
+    assert not index.overlaps(_at(8, 30), _at(9))
+
+def test_overlapping_intervals():
+    index = _index((_at(9), _at(9, 30)))
+    assert index.overlaps(_at(9, 29), _at(9, 45))
+    assert index.overlaps(_at(8, 45), _at(9, 1))
+    assert index.overlaps(_at(9, 10), _at(9, 20))
+    assert index.overlaps(_at(8), _at(11))
+
+def test_long_appointment_found_behind_later_short_ones():
+    index = _index((_at(8), _at(12)), (_at(11), _at(11, 15)))
+    assert index.overlaps(_at(11, 30), _at(11, 45))
+    assert not index.overlaps(_at(12), _at(12, 30))
+
+def test_excluded_appointment_is_ignored():
+    index = _index((_at(9), _at(9, 30)))
+    assert not index.overlaps(_at(9), _at(9, 30), exclude_id=1)
+
+def test_remove_and_re_add():
+    index = _index((_at(9), _at(9, 30)), (_at(10), _at(10, 30)))
+    index.remove(1)
+    assert not index.overlaps(_at(9), _at(9, 30))
+    index.add(2, _at(9), _at(9, 30))
+    assert index.overlaps(_at(9, 15), _at(9, 45))
+    assert not index.overlaps(_at(10), _at(10, 30))
+    assert len(index) == 1
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.models import Appointment
+from app.schemas.appointment import AppointmentCreate
+from app.services.appointment import AppointmentService
+from app.utils.exceptions import DoctorNotFoundException, PatientNotFoundException
+
+MONDAY_NINE = datetime(2030, 1, 7, 9, 0)
+MONDAY_NINE_THIRTY = datetime(2030, 1, 7, 9, 30)
+
+@pytest.fixture(autouse=True)
+def ledger_mode(monkeypatch):
+    monkeypatch.setattr(settings, "APPOINTMENT_BOOKING_MODE", "ledger")
+
+def _booking(patient_id: int, doctor_id: int) -> AppointmentCreate:
+    return AppointmentCreate(
+        patient_id=patient_id, doctor_id=doctor_id, scheduled_time=MONDAY_NINE, end_time=MONDAY_NINE_THIRTY
+    )
+
+@pytest.mark.asyncio
+async def test_ledger_booking(db, parties):
+    appointment = await AppointmentService.create_appointment(db, _booking(parties.patient.id, parties.doctor.id))
+    assert appointment.id is not None
+    assert await db.scalar(select(func.count()).select_from(Appointment)) == 1
+
+@pytest.mark.asyncio
+async def test_ledger_booking_for_unknown_patient_is_a_404(db, parties):
+    with pytest.raises(PatientNotFoundException):
+        await AppointmentService.create_appointment(db, _booking(999, parties.doctor.id))
+    assert await db.scalar(select(func.count()).select_from(Appointment)) == 0
+
+@pytest.mark.asyncio
+async def test_ledger_booking_for_unknown_doctor_is_a_404(db, parties):
+    with pytest.raises(DoctorNotFoundException):
+        await AppointmentService.create_appointment(db, _booking(parties.patient.id, 999))
+
+@pytest.mark.asyncio
+async def test_consecutive_offered_slots_can_both_be_booked(db, parties):
+    # 20-minute slots don't fill whole 15-minute ledger blocks; offered starts must still not collide
+    slots = await AppointmentService.get_available_slots(db, parties.doctor.id, "2030-01-07", slot_minutes=20)
+    assert all(slot.start_time.minute % settings.SLOT_LEDGER_MINUTES == 0 for slot in slots)
+
+    for slot in slots[:2]:
+        await AppointmentService.create_appointment(db, AppointmentCreate(
+            patient_id=parties.patient.id, doctor_id=parties.doctor.id,
+            scheduled_time=slot.start_time, end_time=slot.end_time
+        ))
+    assert await db.scalar(select(func.count()).select_from(Appointment)) == 2
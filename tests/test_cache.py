@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.utils import cache
+from app.utils.cache import SingleFlight, TwoTierCache
+
+class Loader:
+    """Counts calls and blocks each one until released"""
+
+    def __init__(self, value="value", error: Exception = None):
+        self.value = value
+        self.error = error
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+@pytest.fixture
+def no_redis(monkeypatch):
+    monkeypatch.setattr(cache.redis_client, "redis", None)
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_load():
+    flight = SingleFlight("test_flight")
+    load = Loader()
+    callers = [asyncio.create_task(flight.do("key", load)) for _ in range(5)]
+    await load.started.wait()
+    load.release.set()
+
+    assert await asyncio.gather(*callers) == ["value"] * 5
+    assert load.calls == 1
+
+@pytest.mark.asyncio
+async def test_leader_exception_reaches_every_follower():
+    flight = SingleFlight("test_flight")
+    load = Loader(error=RuntimeError("database down"))
+    callers = [asyncio.create_task(flight.do("key", load)) for _ in range(3)]
+    await load.started.wait()
+    load.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) and str(result) == "database down" for result in results)
+    assert load.calls == 1
+
+@pytest.mark.asyncio
+async def test_followers_load_themselves_when_the_leader_is_cancelled():
+    flight = SingleFlight("test_flight")
+    load = Loader()
+    leader = asyncio.create_task(flight.do("key", load))
+    await load.started.wait()
+    follower = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    load.release.set()
+
+    assert await follower == "value"
+    assert load.calls == 2
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+@pytest.mark.asyncio
+async def test_a_new_load_starts_once_the_previous_one_finished():
+    flight = SingleFlight("test_flight")
+    load = Loader()
+    load.release.set()
+
+    assert await flight.do("key", load) == "value"
+    assert await flight.do("key", load) == "value"
+    assert load.calls == 2
+
+@pytest.mark.asyncio
+async def test_two_tier_cache_shares_one_load_and_caches_it(no_redis):
+    two_tier = TwoTierCache("test_shared", "test_shared:", ttl=60, local_ttl=60, local_maxsize=10)
+    load = Loader({"id": 1})
+    callers = [asyncio.create_task(two_tier.get_or_load(1, load)) for _ in range(4)]
+    await load.started.wait()
+    load.release.set()
+
+    assert await asyncio.gather(*callers) == [{"id": 1}] * 4
+    assert await two_tier.get_or_load(1, load) == {"id": 1}
+    assert load.calls == 1
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_returned_but_not_cached(no_redis):
+    two_tier = TwoTierCache("test_race", "test_race:", ttl=60, local_ttl=60, local_maxsize=10)
+    stale = Loader({"name": "old"})
+    reader = asyncio.create_task(two_tier.get_or_load(1, stale))
+    await stale.started.wait()
+    # A write commits and invalidates while the read is still loading the old row
+    await two_tier.invalidate(1)
+    stale.release.set()
+
+    assert await reader == {"name": "old"}
+    assert await two_tier.get(1) is None
+
+    fresh = Loader({"name": "new"})
+    fresh.release.set()
+    assert await two_tier.get_or_load(1, fresh) == {"name": "new"}
+    assert await two_tier.get(1) == {"name": "new"}
@@ -0,0 +1,67 @@
+from datetime import datetime
+from itertools import product
+
+import pytest
+from fastapi import Response
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, create_engine, insert, select
+
+from app.utils.exceptions import InvalidCursorException
+from app.utils.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    keyset_after,
+    parse_cursor_datetime,
+    set_next_cursor,
+)
+
+def test_cursor_round_trip():
+    values = [datetime(2024, 1, 1, 9, 30, 15, 250), 42]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, parse_cursor_datetime, int) == values
+
+def test_single_id_cursor_round_trip():
+    assert decode_cursor(encode_cursor([7]), int) == [7]
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encode_cursor([1]),  # one value where two are expected
+    encode_cursor(["yesterday", 1]),
+    encode_cursor([None, 1]),
+    "eyJhIjogMX0",  # a JSON object instead of a list
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor, parse_cursor_datetime, int)
+
+def test_next_cursor_only_for_full_pages():
+    response = Response()
+    set_next_cursor(response, [1, 2], 3, lambda item: [item])
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+    set_next_cursor(response, [1, 2, 3], 3, lambda item: [item])
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER], int) == [3]
+
+def test_keyset_after_returns_exactly_the_following_rows():
+    table = Table(
+        "rows", MetaData(), Column("id", Integer, primary_key=True), Column("scheduled_time", DateTime)
+    )
+    times = [datetime(2024, 1, 1, hour) for hour in (9, 10, 11)]
+    # Three rows per time, so the id tie-break matters
+    rows = [(index + 1, times[index // 3]) for index in range(9)]
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        table.create(conn)
+        conn.execute(insert(table), [{"id": row_id, "scheduled_time": time} for row_id, time in rows])
+        ordered = sorted(rows, key=lambda row: (row[1], row[0]))
+        for time, row_id in product(times, range(0, 11)):
+            cursor = decode_cursor(encode_cursor([time, row_id]), parse_cursor_datetime, int)
+            query = (
+                select(table.c.id)
+                .where(keyset_after([table.c.scheduled_time, table.c.id], cursor))
+                .order_by(table.c.scheduled_time, table.c.id)
+            )
+            expected = [row[0] for row in ordered if (row[1], row[0]) > (time, row_id)]
+            assert conn.execute(query).scalars().all() == expected
+    engine.dispose()
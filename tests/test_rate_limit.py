@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import rate_limit
+from app.utils.metrics import metrics
+from app.utils.rate_limit import RateLimiter, RateLimitPolicy
+
+# A window boundary, in seconds, so offsets below are elapsed times within a window
+EPOCH = 60 * 28_000_000
+
+class Clock:
+    def __init__(self):
+        self.now = EPOCH
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+@pytest.fixture
+def limiter(monkeypatch) -> RateLimiter:
+    # No Redis: every hit goes through the per-process fallback
+    monkeypatch.setattr(rate_limit.redis_client, "redis", None)
+    return RateLimiter()
+
+def _hit(limiter: RateLimiter, policy: RateLimitPolicy):
+    return asyncio.run(limiter.hit("test", policy, "ip:127.0.0.1"))
+
+def test_local_fallback_admits_up_to_the_limit(clock, limiter):
+    policy = RateLimitPolicy(3, 60)
+    clock.now = EPOCH + 10
+    before = metrics.snapshot()["counters"].get("rate_limit.local_fallback", 0)
+
+    decisions = [_hit(limiter, policy) for _ in range(4)]
+
+    assert [decision.allowed for decision in decisions] == [True, True, True, False]
+    assert [decision.remaining for decision in decisions[:3]] == [2, 1, 0]
+    assert decisions[0].reset == 50
+    assert decisions[3].retry_after == 70
+    assert "Retry-After" in decisions[3].headers()
+    assert metrics.snapshot()["counters"]["rate_limit.local_fallback"] == before + 4
+
+@pytest.mark.parametrize("limit, previous, current, elapsed", [
+    (10, 10, 2, 15),  # the previous window's tail is in the way
+    (10, 0, 10, 20),  # the current window is full
+    (5, 2, 4, 45),
+    (1, 0, 1, 30),
+])
+def test_retry_after_is_the_earliest_second_a_request_fits(clock, limiter, limit, previous, current, elapsed):
+    policy = RateLimitPolicy(limit, 60)
+    clock.now = EPOCH - 60
+    assert all(_hit(limiter, policy).allowed for _ in range(previous))
+    clock.now = EPOCH + elapsed
+    assert all(_hit(limiter, policy).allowed for _ in range(current))
+
+    rejected = _hit(limiter, policy)
+    assert not rejected.allowed
+
+    # Rejected requests are not counted, so probing just before Retry-After is still refused
+    clock.now = EPOCH + elapsed + rejected.retry_after - 1
+    assert not _hit(limiter, policy).allowed
+    clock.now = EPOCH + elapsed + rejected.retry_after
+    assert _hit(limiter, policy).allowed
+
+def test_policy_parse():
+    assert RateLimitPolicy.parse("300/60") == RateLimitPolicy(300, 60, "user")
+    assert RateLimitPolicy.parse("10/60/ip") == RateLimitPolicy(10, 60, "ip")
+    assert RateLimitPolicy.parse("5/1", scope="ip") == RateLimitPolicy(5, 1, "ip")
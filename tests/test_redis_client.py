@@ -0,0 +1,174 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.utils import redis_client as redis_client_module
+from app.utils.redis_client import CircuitBreaker, RedisClient
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+class FakeRedis:
+    """Answers get() from `values`, raises `error` or blocks while `hang` is set"""
+
+    def __init__(self):
+        self.values = {}
+        self.error = None
+        self.hang = False
+        self.calls = 0
+
+    async def get(self, key):
+        self.calls += 1
+        if self.hang:
+            await asyncio.Event().wait()
+        if self.error is not None:
+            raise self.error
+        return self.values.get(key)
+
+    def pipeline(self, transaction: bool = True):
+        return SimpleNamespace(execute=self._execute)
+
+    async def _execute(self):
+        return []
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(redis_client_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+@pytest.fixture
+def client(clock) -> RedisClient:
+    client = RedisClient()
+    client.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=5)
+    client.fallback = None
+    client.redis = FakeRedis()
+    return client
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=5)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.available
+    assert not breaker.allow()
+
+def test_only_one_probe_is_let_through_after_the_cool_down(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5)
+    _open(breaker)
+    clock.now += 4.9
+    assert not breaker.allow()
+
+    clock.now += 0.1
+    # Looking does not claim the probe
+    assert breaker.available
+    assert breaker.available
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.available
+    assert not breaker.allow()
+
+def test_successful_probe_closes_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5)
+    _open(breaker)
+    clock.now += 5
+    assert breaker.allow()
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+def test_failed_probe_reopens_for_a_full_cool_down(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=5)
+    _open(breaker)
+    clock.now += 5
+    assert breaker.allow()
+    # One failure is enough while half-open
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 4.9
+    assert not breaker.allow()
+    clock.now += 0.1
+    assert breaker.allow()
+
+def test_released_probe_lets_the_next_caller_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5)
+    _open(breaker)
+    clock.now += 5
+    assert breaker.allow()
+    breaker.release_probe()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+@pytest.mark.asyncio
+async def test_client_fails_fast_while_open(client):
+    client.redis.error = RedisConnectionError("refused")
+    for _ in range(2):
+        with pytest.raises(RedisConnectionError):
+            await client.get("key")
+
+    assert not client.is_connected
+    assert await client.get("key") is None
+    assert client.pipeline() is None
+    assert client.redis.calls == 2
+
+@pytest.mark.asyncio
+async def test_client_probe_closes_the_circuit_once_redis_answers(client, clock):
+    client.redis.error = RedisConnectionError("refused")
+    for _ in range(2):
+        with pytest.raises(RedisConnectionError):
+            await client.get("key")
+    clock.now += 5
+    client.redis.error = None
+    client.redis.values["key"] = "value"
+
+    assert client.is_connected
+    assert await client.get("key") == "value"
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_does_not_wedge_the_circuit(client, clock):
+    _open(client.breaker)
+    clock.now += 5
+    client.redis.hang = True
+    probe = asyncio.create_task(client.get("key"))
+    await asyncio.sleep(0)
+    assert not client.is_connected
+
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.is_connected
+
+@pytest.mark.asyncio
+async def test_pipeline_execute_respects_the_probe(client, clock):
+    _open(client.breaker)
+    clock.now += 5
+    pipe = client.pipeline()
+    assert pipe is not None
+    # Someone else takes the single probe before this batch is sent
+    assert client.breaker.allow()
+
+    with pytest.raises(RedisConnectionError):
+        await pipe.execute()
@@ -0,0 +1,118 @@
+import random
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from app.utils.schedule import (
+    MINUTES_PER_DAY,
+    CompiledSchedule,
+    booked_day_masks,
+    fitting_starts,
+    iter_bits,
+    iter_runs,
+    window_mask,
+)
+
+MONDAY = date(2024, 1, 1)
+TUESDAY = date(2024, 1, 2)
+
+def _brute_force_starts(free: int, length: int) -> int:
+    starts = 0
+    for start in range(MINUTES_PER_DAY - length + 1):
+        if free & window_mask(start, start + length) == window_mask(start, start + length):
+            starts |= 1 << start
+    return starts
+
+def _availability(day_of_week: int, start_time: str, end_time: str, is_available: bool = True):
+    return SimpleNamespace(
+        id=None, day_of_week=day_of_week, start_time=start_time, end_time=end_time, is_available=is_available
+    )
+
+def test_fitting_starts_single_run():
+    free = window_mask(10, 20)
+    assert fitting_starts(free, 1) == free
+    assert fitting_starts(free, 5) == window_mask(10, 16)
+    assert fitting_starts(free, 10) == 1 << 10
+    assert fitting_starts(free, 11) == 0
+
+def test_fitting_starts_skips_runs_that_are_too_short():
+    free = window_mask(0, 3) | window_mask(5, 10)
+    assert fitting_starts(free, 3) == (1 << 0) | window_mask(5, 8)
+    assert fitting_starts(free, 4) == window_mask(5, 7)
+
+def test_fitting_starts_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(50):
+        free = 0
+        for _ in range(rng.randint(1, 8)):
+            start = rng.randrange(MINUTES_PER_DAY)
+            free |= window_mask(start, min(start + rng.randint(1, 240), MINUTES_PER_DAY))
+        length = rng.choice([1, 15, 30, 45, 60, 90])
+        assert fitting_starts(free, length) == _brute_force_starts(free, length)
+
+def test_iter_runs():
+    assert list(iter_runs(0)) == []
+    mask = window_mask(0, 3) | window_mask(5, 10) | window_mask(MINUTES_PER_DAY - 1, MINUTES_PER_DAY)
+    assert list(iter_runs(mask)) == [(0, 3), (5, 10), (MINUTES_PER_DAY - 1, MINUTES_PER_DAY)]
+    assert list(iter_runs(window_mask(0, MINUTES_PER_DAY))) == [(0, MINUTES_PER_DAY)]
+
+def test_booked_day_masks_splits_at_midnight():
+    masks = booked_day_masks([(datetime(2024, 1, 1, 23, 30), datetime(2024, 1, 2, 0, 45))])
+    assert masks == {MONDAY: window_mask(23 * 60 + 30, MINUTES_PER_DAY), TUESDAY: window_mask(0, 45)}
+
+def test_booked_day_masks_merges_and_rounds_partial_minutes_up():
+    masks = booked_day_masks([
+        (datetime(2024, 1, 1, 9, 0), datetime(2024, 1, 1, 9, 30)),
+        (datetime(2024, 1, 1, 9, 30), datetime(2024, 1, 1, 10, 0, 30)),
+    ])
+    assert masks == {MONDAY: window_mask(9 * 60, 10 * 60 + 1)}
+
+def test_booked_day_masks_interval_ending_at_midnight_stays_on_its_day():
+    masks = booked_day_masks([(datetime(2024, 1, 1, 23, 0), datetime(2024, 1, 2, 0, 0))])
+    assert masks == {MONDAY: window_mask(23 * 60, MINUTES_PER_DAY)}
+
+def test_is_available_across_midnight():
+    schedule = CompiledSchedule.compile(1, [
+        _availability(MONDAY.weekday(), "20:00", "24:00"),
+        _availability(TUESDAY.weekday(), "00:00", "02:00"),
+    ])
+    assert schedule.is_available(datetime(2024, 1, 1, 23, 30), datetime(2024, 1, 2, 0, 30))
+    assert schedule.is_available(datetime(2024, 1, 1, 23, 0), datetime(2024, 1, 2, 0, 0))
+    assert not schedule.is_available(datetime(2024, 1, 1, 23, 30), datetime(2024, 1, 2, 2, 30))
+    assert not schedule.is_available(datetime(2024, 1, 1, 19, 30), datetime(2024, 1, 1, 20, 30))
+
+def test_is_available_needs_both_sides_of_midnight():
+    schedule = CompiledSchedule.compile(1, [_availability(MONDAY.weekday(), "20:00", "24:00")])
+    assert not schedule.is_available(datetime(2024, 1, 1, 23, 30), datetime(2024, 1, 2, 0, 30))
+
+def test_is_available_ignores_closed_windows_and_empty_intervals():
+    schedule = CompiledSchedule.compile(1, [
+        _availability(MONDAY.weekday(), "08:00", "12:00"),
+        _availability(MONDAY.weekday(), "12:00", "17:00", is_available=False),
+    ])
+    assert schedule.is_available(datetime(2024, 1, 1, 11, 0), datetime(2024, 1, 1, 12, 0))
+    assert not schedule.is_available(datetime(2024, 1, 1, 11, 30), datetime(2024, 1, 1, 12, 30))
+    assert not schedule.is_available(datetime(2024, 1, 1, 9, 0), datetime(2024, 1, 1, 9, 0))
+
+def test_is_available_rounds_partial_end_minute_up():
+    schedule = CompiledSchedule.compile(1, [_availability(MONDAY.weekday(), "08:00", "09:00")])
+    assert schedule.is_available(datetime(2024, 1, 1, 8, 0), datetime(2024, 1, 1, 9, 0))
+    assert not schedule.is_available(datetime(2024, 1, 1, 8, 0), datetime(2024, 1, 1, 9, 0, 30))
+
+def _minutes(mask: int):
+    return [f"{minute // 60:02d}:{minute % 60:02d}" for minute in iter_bits(mask)]
+
+def test_slot_grid_starts_at_each_window():
+    schedule = CompiledSchedule.compile(1, [_availability(MONDAY.weekday(), "09:10", "11:00")])
+    assert _minutes(schedule.slot_grid(MONDAY.weekday(), 30)) == ["09:10", "09:40", "10:10"]
+
+def test_aligned_slot_grid_rounds_starts_and_step_up():
+    schedule = CompiledSchedule.compile(1, [_availability(MONDAY.weekday(), "09:10", "11:00")])
+    assert _minutes(schedule.slot_grid(MONDAY.weekday(), 30, align=15)) == ["09:15", "09:45", "10:15"]
+    assert _minutes(schedule.slot_grid(MONDAY.weekday(), 20, align=15)) == ["09:15", "09:45", "10:15"]
+
+def test_aligned_slots_need_their_whole_last_block_unbooked():
+    schedule = CompiledSchedule.compile(1, [_availability(MONDAY.weekday(), "09:00", "10:30")])
+    booked = window_mask(9 * 60 + 25, 9 * 60 + 40)
+    assert _minutes(schedule.free_slot_starts(MONDAY, booked, 20)) == ["09:00", "09:40", "10:00"]
+    # 09:00-09:20 would claim the 09:15 block the booking already touches
+    assert _minutes(schedule.free_slot_starts(MONDAY, booked, 20, align=15)) == ["10:00"]